@@ -0,0 +1,94 @@
+"""
+Compare the memory footprint of the slotted AccountData with the previous dict-based class.
+
+Usage: python benchmarks/account_memory.py [accounts]
+"""
+import gc
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.core.account import AccountData
+from utils.settings import CONNECTION_STATES
+
+
+# AccountData as it was before the slotted rewrite
+class LegacyAccountData:
+    def __init__(self, token, index, proxy=None):
+        self.token = token
+        self.index = index
+        self.proxy = proxy
+        self.status_connect = CONNECTION_STATES["NONE_CONNECTION"]
+        self.points_per_proxy = {}
+        self.account_info = {}
+        self.claimed_rewards = set()
+        self.retries = 0
+        self.last_ping_status = 'Waiting...'
+        self.browser_ids = [
+            {
+                'ping_count': 0,
+                'successful_pings': 0,
+                'score': 0,
+                'start_time': time.time(),
+                'last_ping_time': None
+            }
+        ]
+
+# Session payload shaped like the SESSION endpoint response
+def session_payload(index):
+    return {
+        "uid": f"{index:018d}",
+        "name": f"user{index}",
+        "email": f"user{index}@example.com",
+        "avatar": None,
+        "referral_code": f"REF{index:08d}",
+        "referral_link": f"https://app.nodepay.ai/register?ref=REF{index:08d}",
+        "state": "ACTIVE",
+        "network_earning_rate": 1.0,
+        "balance": {"current_amount": 0, "total_collected": 0, "total_redeemed": 0},
+    }
+
+# Build accounts that have synced their profile, claimed one reward and pinged once
+def build(factory, tokens):
+    accounts = []
+    for index, token in enumerate(tokens, start=1):
+        account = factory(token, index)
+        payload = session_payload(index)
+        if isinstance(account, LegacyAccountData):
+            account.account_info = payload
+            account.claimed_rewards.add("每日")
+            account.browser_ids[0]['last_ping_time'] = time.time()
+        else:
+            account.uid = payload["uid"]
+            account.mark_claimed("每日")
+            account.browser.last_ping_time = time.time()
+        accounts.append(account)
+    return accounts
+
+# Measure bytes allocated to hold the accounts
+def measure(factory, tokens):
+    gc.collect()
+    tracemalloc.start()
+    accounts = build(factory, tokens)
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del accounts
+    return current
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    tokens = [f"{index:064x}" for index in range(count)]
+
+    legacy = measure(LegacyAccountData, tokens)
+    compact = measure(AccountData, tokens)
+
+    print(f"accounts: {count}")
+    print(f"legacy AccountData:  {legacy / 2**20:8.1f} MiB ({legacy / count:6.0f} B/account)")
+    print(f"slotted AccountData: {compact / 2**20:8.1f} MiB ({compact / count:6.0f} B/account)")
+    print(f"saved: {(legacy - compact) / 2**20:.1f} MiB ({1 - compact / legacy:.0%})")
+
+if __name__ == '__main__':
+    main()
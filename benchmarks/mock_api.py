@@ -0,0 +1,156 @@
+"""
+Local stand-in for every DOMAIN_API endpoint, plus a forwarding HTTP proxy, for offline benchmarks.
+
+Usage: python benchmarks/mock_api.py [--port 8800] [--proxy-port 8801] [--latency 50] [--error-rate 0.01]
+                                     [--rate-limit 0.01] [--retry-after 5]
+
+Point the bot at it with API_BASE_URL=http://127.0.0.1:8800 and PING_BASE_URL=http://127.0.0.1:8800.
+"""
+import argparse
+import asyncio
+import random
+import time
+
+from aiohttp import ClientSession, web
+
+
+# Headers a forwarding proxy must not copy between hops
+HOP_HEADERS = {"connection", "keep-alive", "proxy-authorization", "proxy-connection", "transfer-encoding", "host", "content-length"}
+
+
+# Latency, failure and throttling behaviour of the stand-in API
+class MockBehaviour:
+    def __init__(self, latency=0.05, jitter=0.5, error_rate=0.0, rate_limit=0.0, retry_after=5):
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.rate_limit = rate_limit
+        self.retry_after = retry_after
+        self.requests = {}
+        self.first_request = asyncio.Event()
+        self.first_request_at = None
+
+    # Sleep for the configured latency, then answer with an injected error or the endpoint's data
+    async def respond(self, request, data):
+        self.requests[request.path] = self.requests.get(request.path, 0) + 1
+        if self.first_request_at is None:
+            self.first_request_at = time.monotonic()
+            self.first_request.set()
+        if self.latency:
+            await asyncio.sleep(self.latency * random.uniform(1 - self.jitter, 1 + self.jitter))
+
+        roll = random.random()
+        if roll < self.rate_limit:
+            return web.json_response({"success": False, "msg": "Too many requests"}, status=429, headers={"Retry-After": str(self.retry_after)})
+        if roll < self.rate_limit + self.error_rate:
+            return web.json_response({"success": False, "msg": "Internal error"}, status=500)
+        return web.json_response({"success": True, "code": 0, "msg": "Success", "data": data})
+
+
+# Stable fake uid derived from the bearer token
+def uid_for(request):
+    return str(abs(hash(request.headers.get("Authorization", ""))) % 10**18)
+
+
+def build_app(behaviour):
+    routes = web.RouteTableDef()
+
+    @routes.post("/api/auth/active-account")
+    async def activate(request):
+        return await behaviour.respond(request, True)
+
+    @routes.post("/api/auth/session")
+    async def session(request):
+        uid = uid_for(request)
+        return await behaviour.respond(request, {
+            "uid": uid, "name": f"user{uid[-6:]}", "email": f"user{uid[-6:]}@example.com",
+            "referral_link": f"https://app.nodepay.ai/register?ref={uid[-8:]}", "state": "ACTIVE", "network_earning_rate": 1,
+        })
+
+    @routes.get("/api/earn/info")
+    async def earn_info(request):
+        return await behaviour.respond(request, {
+            "season_name": "Season 2", "total_earning": 1234.5, "today_earning": 12.5, "current_point": 1000, "pending_point": 20,
+        })
+
+    @routes.get("/api/mission")
+    async def mission(request):
+        return await behaviour.respond(request, [
+            {"id": 1, "status": "AVAILABLE", "current_process": 1, "target_process": 1, "remain_time": 0},
+            {"id": 19, "status": "LOCK", "current_process": 0, "target_process": 1, "remain_time": 3_600_000},
+            {"id": 15, "status": "COMPLETED", "current_process": 7, "target_process": 7, "remain_time": 0},
+            {"id": 16, "status": "AVAILABLE", "current_process": 14, "target_process": 14, "remain_time": 0},
+            {"id": 17, "status": "SOON", "current_process": 14, "target_process": 21, "remain_time": 604_800_000},
+        ])
+
+    @routes.post("/api/mission/complete-mission")
+    async def complete_mission(request):
+        return await behaviour.respond(request, {"earned_points": 100})
+
+    @routes.post("/api/network/ping")
+    async def ping(request):
+        return await behaviour.respond(request, {"ip_score": random.randint(60, 100), "version": "2.2.7"})
+
+    app = web.Application()
+    app.add_routes(routes)
+    return app
+
+# Plain-HTTP forwarding proxy: requests arrive in absolute form and are replayed against their target
+def build_proxy_app():
+    async def forward(request):
+        session = request.app["session"]
+        headers = {name: value for name, value in request.headers.items() if name.lower() not in HOP_HEADERS}
+        body = await request.read()
+        async with session.request(request.method, str(request.url), headers=headers, data=body or None, allow_redirects=False) as upstream:
+            payload = await upstream.read()
+            return web.Response(body=payload, status=upstream.status,
+                                headers={name: value for name, value in upstream.headers.items() if name.lower() not in HOP_HEADERS})
+
+    async def open_session(app):
+        app["session"] = ClientSession()
+        yield
+        await app["session"].close()
+
+    app = web.Application()
+    app.router.add_route("*", "/{path:.*}", forward)
+    app.cleanup_ctx.append(open_session)
+    return app
+
+# Start the API (and optionally the proxy) on localhost, returning the runners to clean up
+async def start_mock(behaviour, port, proxy_port=None, host="127.0.0.1"):
+    runners = []
+    for app, app_port in ((build_app(behaviour), port), (build_proxy_app(), proxy_port)):
+        if app_port is None:
+            continue
+        runner = web.AppRunner(app, access_log=None)
+        await runner.setup()
+        await web.TCPSite(runner, host, app_port, backlog=4096).start()
+        runners.append(runner)
+    return runners
+
+def parse_behaviour(parser):
+    parser.add_argument("--latency", type=float, default=50, help="mean response latency in milliseconds")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="fraction of requests answered with 500")
+    parser.add_argument("--rate-limit", type=float, default=0.0, help="fraction of requests answered with 429")
+    parser.add_argument("--retry-after", type=int, default=5, help="Retry-After seconds sent with 429s")
+
+def behaviour_from(args):
+    return MockBehaviour(latency=args.latency / 1000, error_rate=args.error_rate, rate_limit=args.rate_limit, retry_after=args.retry_after)
+
+async def serve(args):
+    await start_mock(behaviour_from(args), args.port, args.proxy_port)
+    print(f"Mock API on http://127.0.0.1:{args.port}, proxy on http://127.0.0.1:{args.proxy_port}")
+    await asyncio.Event().wait()
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--port", type=int, default=8800)
+    parser.add_argument("--proxy-port", type=int, default=8801)
+    parse_behaviour(parser)
+    try:
+        asyncio.run(serve(parser.parse_args()))
+    except KeyboardInterrupt:
+        pass
+
+if __name__ == '__main__':
+    main()
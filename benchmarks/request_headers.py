@@ -0,0 +1,76 @@
+"""
+Measure per-request header building and payload serialization before and after the precomputed templates.
+
+Usage: python benchmarks/request_headers.py [iterations]
+"""
+import json
+import os
+import sys
+import time
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.core.account import AccountData
+from utils.services.api_client import build_headers, encode_payload
+from utils.settings import DOMAIN_API
+
+
+# Header building as it was before the templates: dicts rebuilt and the payload dumped to validate it
+def legacy_endpoint_headers(url):
+    EARN_MISSION_SET = {DOMAIN_API["EARN_INFO"], DOMAIN_API["MISSION"], DOMAIN_API["COMPLETE_MISSION"]}
+    PING_LIST = DOMAIN_API["PING"]
+    ACTIVATE_URL = DOMAIN_API["ACTIVATE"]
+
+    necessary_headers = {
+        "Accept": "application/json, text/plain, */*",
+        "Accept-Language": "en-US,en;q=0.9",
+        "Referer": "https://app.nodepay.ai/",
+        "Origin": "chrome-extension://lgmpfmgeabnnlemejacfljbmonaomfmm",
+        "Connection": "keep-alive",
+    }
+    optional_headers = {
+        "Sec-CH-UA": '"Not/A)Brand";v="8", "Chromium";v="126", "Herond";v="126"',
+        "Sec-Ch-Ua-Mobile": "?0",
+        "Sec-Ch-Ua-Platform": '"Windows"',
+        "Sec-Fetch-Dest": "empty",
+        "Sec-Fetch-Mode": "cors",
+        "Sec-Fetch-Site": "cors-site",
+        "Pragma": "no-cache",
+        "Cache-Control": "no-cache",
+    }
+
+    if url in PING_LIST or url in EARN_MISSION_SET or url == ACTIVATE_URL:
+        return {**necessary_headers, **optional_headers}
+    return {"Accept": "application/json"}
+
+def legacy_request(url, account, data):
+    headers = {
+        "Authorization": f"Bearer {account.token}",
+        "Content-Type": "application/json",
+        "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/130.0.0.0 Safari/537.36",
+    }
+    headers.update(legacy_endpoint_headers(url))
+    json.dumps(data, ensure_ascii=False)
+
+    # curl_cffi serialized json= payloads a second time
+    return headers, json.dumps(data, separators=(",", ":")).encode()
+
+def current_request(url, account, data):
+    return build_headers(url, account), encode_payload("POST", data)
+
+def main():
+    iterations = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+    account = AccountData("x" * 180, 1)
+    account.uid = "1234567890123456789"
+    url = DOMAIN_API["PING"][0]
+    data = {"id": account.uid, "browser_id": account.browser.to_dict(), "timestamp": int(time.time()), "version": "2.2.7"}
+
+    assert legacy_request(url, account, data) == current_request(url, account, data)
+
+    for name, function in (("legacy", legacy_request), ("templates", current_request)):
+        seconds = min(timeit.repeat(lambda: function(url, account, data), number=iterations, repeat=5))
+        print(f"{name:>10}: {seconds / iterations * 1e6:6.2f} us/request")
+
+if __name__ == '__main__':
+    main()
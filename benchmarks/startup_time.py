@@ -0,0 +1,120 @@
+"""
+Measure how long main.py takes to import the bot and to send its first API request, and check both against a budget.
+
+Import time is the median over --runs fresh interpreters importing what main.py imports. Time to first request
+runs `main.py --headless --no-proxy` against the local mock API in an empty directory and measures from process
+start until the mock receives the first request. Exits with status 1 when either median is over budget.
+
+Usage: python benchmarks/startup_time.py [--runs 5] [--import-budget 0.35] [--first-request-budget 0.75]
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+from mock_api import MockBehaviour, start_mock
+
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+API_PORT = 8812
+
+# Seconds, on a warm disk cache
+IMPORT_BUDGET = 0.35
+FIRST_REQUEST_BUDGET = 0.75
+
+# What main.py imports for a single-process run, timed inside a fresh interpreter
+IMPORT_PROBE = (
+    "import time; started = time.perf_counter()\n"
+    "from utils.core import process\n"
+    "from utils.services.fast_mode import run\n"
+    "print(time.perf_counter() - started)"
+)
+
+
+def measure_import():
+    output = subprocess.run([sys.executable, "-c", IMPORT_PROBE], cwd=ROOT, capture_output=True, text=True, check=True).stdout
+    return float(output.strip().splitlines()[-1])
+
+# Environment pointing a headless run at the mock API with everything optional turned off
+def child_env():
+    env = dict(os.environ)
+    env.update({
+        "API_BASE_URL": f"http://127.0.0.1:{API_PORT}",
+        "PING_BASE_URL": f"http://127.0.0.1:{API_PORT}",
+        "PING_ENDPOINTS": "",
+        "PROXY_CHECK": "False",
+        "METRICS_PORT": "0",
+        "DASHBOARD": "False",
+        "LOG_FORMAT": "plain",
+        "LOG_FILE": "",
+        "STATE_FILE": "",
+        "WORKERS": "1",
+    })
+    return env
+
+async def measure_first_request(behaviour, workdir):
+    behaviour.first_request_at = None
+    behaviour.first_request.clear()
+
+    started = time.monotonic()
+    process = await asyncio.create_subprocess_exec(
+        sys.executable, os.path.join(ROOT, "main.py"), "--headless", "--no-proxy", "--tokens", os.path.join(workdir, "tokens.txt"),
+        cwd=workdir, env=child_env(), stdin=asyncio.subprocess.DEVNULL, stdout=asyncio.subprocess.DEVNULL, stderr=asyncio.subprocess.DEVNULL,
+    )
+    try:
+        await asyncio.wait_for(behaviour.first_request.wait(), 30)
+        return behaviour.first_request_at - started
+    except asyncio.TimeoutError:
+        return None
+    finally:
+        process.terminate()
+        try:
+            await asyncio.wait_for(process.wait(), 5)
+        except asyncio.TimeoutError:
+            process.kill()
+            await process.wait()
+
+async def measure_first_requests(runs):
+    behaviour = MockBehaviour(latency=0)
+    runners = await start_mock(behaviour, API_PORT)
+    try:
+        with tempfile.TemporaryDirectory() as workdir:
+            with open(os.path.join(workdir, "tokens.txt"), "w") as file:
+                file.write("startup-benchmark-token\n")
+            return [await measure_first_request(behaviour, workdir) for _ in range(runs)]
+    finally:
+        for runner in runners:
+            await runner.cleanup()
+
+def report(name, samples, budget):
+    if not samples or None in samples:
+        print(f"{name:<22} failed")
+        return False
+    median = statistics.median(samples)
+    within = median <= budget
+    print(f"{name:<22} median {median * 1000:7.1f} ms  (min {min(samples) * 1000:.1f}, max {max(samples) * 1000:.1f})  "
+          f"budget {budget * 1000:.0f} ms  {'ok' if within else 'OVER BUDGET'}")
+    return within
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--import-budget", type=float, default=IMPORT_BUDGET, help="seconds")
+    parser.add_argument("--first-request-budget", type=float, default=FIRST_REQUEST_BUDGET, help="seconds")
+    args = parser.parse_args()
+
+    # Warm the disk cache so the first sample is not an outlier
+    measure_import()
+    imports = [measure_import() for _ in range(args.runs)]
+    first_requests = asyncio.run(measure_first_requests(args.runs))
+
+    within = report("import", imports, args.import_budget)
+    within = report("time to first request", first_requests, args.first_request_budget) and within
+    sys.exit(0 if within else 1)
+
+if __name__ == '__main__':
+    main()
@@ -1,12 +1,42 @@
-import asyncio
-from utils.core import process
+import argparse
+import os
 
 
-async def main():
-    await process()
+# Command-line flags, each overriding the .env setting named in its help
+def parse_args():
+    parser = argparse.ArgumentParser(description="NodepayBot")
+    proxy = parser.add_mutually_exclusive_group()
+    proxy.add_argument("--proxy", dest="use_proxy", action="store_const", const="true", help="use the proxy file without asking (USE_PROXY=true)")
+    proxy.add_argument("--no-proxy", dest="use_proxy", action="store_const", const="false", help="connect directly without asking (USE_PROXY=false)")
+    parser.add_argument("--tokens", metavar="PATH", help="token file (TOKENS_FILE)")
+    parser.add_argument("--proxies", metavar="PATH", help="proxy file (PROXIES_FILE)")
+    parser.add_argument("--workers", type=int, metavar="N", help="worker processes (WORKERS)")
+    parser.add_argument("--headless", action="store_const", const="True", help="never prompt for input (HEADLESS=True)")
+    return parser.parse_args()
+
+# Export the given flags as environment variables, which take precedence over .env when the settings are loaded
+def apply_args(args):
+    overrides = {"USE_PROXY": args.use_proxy, "TOKENS_FILE": args.tokens, "PROXIES_FILE": args.proxies,
+                 "WORKERS": args.workers, "HEADLESS": args.headless}
+    for name, value in overrides.items():
+        if value is not None:
+            os.environ[name] = str(value)
+
+def main():
+    # The bot is imported only after the flags are applied, so the settings see them
+    from utils.settings import WORKERS
+
+    if WORKERS > 1:
+        from utils.core.supervisor import run_supervisor
+        run_supervisor(WORKERS)
+    else:
+        from utils.core import process
+        from utils.services.fast_mode import run
+        run(process())
 
 if __name__ == '__main__':
+    apply_args(parse_args())
     try:
-        asyncio.run(main())
+        main()
     except (KeyboardInterrupt, SystemExit):
         pass
@@ -1 +1 @@
-from .account import process
\ No newline at end of file
+from .account import process
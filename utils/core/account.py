@@ -1,46 +1,94 @@
 import asyncio
+import itertools
 import time
 
-from utils.network import get_profile_info, ping_all_accounts
+from utils.core.dashboard import Dashboard, state_counts
+from utils.core.reloader import FleetReloader
+from utils.network import get_profile_info, ping_all_accounts, schedule_account, ClaimScheduler
 from utils.services import get_proxy_choice, assign_proxies
-from utils.services import processed_tokens, load_tokens, send_request
-from utils.settings import ACTIVATE_ACCOUNTS, DAILY_CLAIM, logger, Fore
+from utils.services import processed_tokens, iter_tokens, send_request, close_sessions, close_ip_session
+from utils.services import open_state_store, restore_accounts, is_fresh, proxy_pool, prevalidate_proxies
+from utils.services import start_metrics_server, stop_metrics_server, start_instrumentation, stop_instrumentation, log_runtime
+from utils.services import mark_fleet_start, expect_first_ping, mark_fleet_loaded, discard_first_ping
+from utils.settings import ACTIVATE_ACCOUNTS, DAILY_CLAIM, LOAD_BATCH_SIZE, STARTUP_CONCURRENCY, STATE_FLUSH_INTERVAL, PROXY_CHECK, METRICS_PORT, DASHBOARD, logger, Fore
 from utils.settings import DOMAIN_API, CONNECTION_STATES, setup_logging, startup_art
 
 
 cleaning_up = False
+# Startup tasks of accounts added while running
+startup_tasks = set()
+
+# Per-browser ping counters, sent to the API as the ping's browser_id
+class BrowserStats:
+    __slots__ = ('ping_count', 'successful_pings', 'score', 'start_time', 'last_ping_time')
+
+    def __init__(self):
+        self.ping_count = 0
+        self.successful_pings = 0
+        self.score = 0
+        self.start_time = time.time()
+        self.last_ping_time = None
+
+    def to_dict(self):
+        return {slot: getattr(self, slot) for slot in self.__slots__}
 
 # Account class to hold token, proxy, and other details for each account
 class AccountData:
-    def __init__(self, token, index, proxy=None):
+    __slots__ = ('token', 'authorization', 'index', 'proxy', 'copy', '_status_connect', 'uid', 'synced_at', 'claimed_rewards', 'next_claim_time', 'browser', 'started_at')
+
+    def __init__(self, token, index, proxy=None, copy=0):
         self.token = token
+        self.authorization = f"Bearer {token}"
         self.index = index
         self.proxy = proxy
 
+        # Which copy of its token this account is, so copies keep separate saved state
+        self.copy = copy
+
         # Set the initial connection status to 'None' (no connection)
+        self._status_connect = None
         self.status_connect = CONNECTION_STATES["NONE_CONNECTION"]
-        self.points_per_proxy = {}
-        self.account_info = {}
-        self.claimed_rewards = set()
-        self.retries = 0
-        self.last_ping_status = 'Waiting...'
-
-        # Initialize a list to hold browser session details (such as ping counts and scores)
-        self.browser_ids = [
-            {
-                'ping_count': 0,
-                'successful_pings': 0,
-                'score': 0,
-                'start_time': time.time(),
-                'last_ping_time': None
-            }
-        ]
+
+        # Only the profile field the pings need is kept from the session payload
+        self.uid = None
+        self.synced_at = None
+
+        # Names of claimed rewards, allocated on the first claim
+        self.claimed_rewards = None
+        self.next_claim_time = None
+
+        # Browser session details (such as ping counts and scores)
+        self.browser = BrowserStats()
+
+        # Set once the account's startup pipeline hands it to the ping scheduler
+        self.started_at = None
+
+    # Connection status; changes are tallied in state_counts so summaries never scan every account
+    @property
+    def status_connect(self):
+        return self._status_connect
+
+    @status_connect.setter
+    def status_connect(self, state):
+        if self._status_connect is not None:
+            state_counts[self._status_connect] -= 1
+        state_counts[state] += 1
+        self._status_connect = state
+
+    # Record a claimed reward by name
+    def mark_claimed(self, reward_name):
+        if self.claimed_rewards is None:
+            self.claimed_rewards = set()
+        self.claimed_rewards.add(reward_name)
+
+    # Check whether a reward has been claimed
+    def has_claimed(self, reward_name):
+        return self.claimed_rewards is not None and reward_name in self.claimed_rewards
 
     # Reset account state for retries or disconnection
     def reset(self):
         self.status_connect = CONNECTION_STATES["NONE_CONNECTION"]
-        self.account_info = {}
-        self.retries = 3
+        self.uid = None
         logger.info(f"{Fore.CYAN}00{Fore.RESET} - {Fore.GREEN}正在重置账户 {self.index}{Fore.RESET}")
 
 # Activate accounts and update their status
@@ -89,47 +137,209 @@ async def clean_up_resources():
     except asyncio.CancelledError:
         pass
 
+    stop_instrumentation()
+    await close_sessions()
+    await close_ip_session()
+    await stop_metrics_server()
+
     logger.info(f"{Fore.CYAN}00{Fore.RESET} - {Fore.GREEN}清理完成{Fore.RESET}")
 
-# Main function to manage the application flow
-async def process():
+# Summarize ping counters for a group of accounts
+def collect_stats(accounts):
+    stats = {"accounts": len(accounts), "connected": 0, "ping_count": 0, "successful_pings": 0, "score": 0}
+    for account in accounts:
+        browser = account.browser
+        stats["connected"] += account.status_connect == CONNECTION_STATES["CONNECTED"]
+        stats["ping_count"] += browser.ping_count
+        stats["successful_pings"] += browser.successful_pings
+        stats["score"] += browser.score
+    return stats
+
+# Lazily create accounts from (index, token, proxy) entries, numbering each copy of a token with the lowest
+# ordinal not already taken by `accounts`
+def build_accounts(entries, accounts=()):
+    taken = {}
+    for account in accounts:
+        taken.setdefault(account.token, set()).add(account.copy)
+
+    for index, token, proxy in entries:
+        used = taken.setdefault(token, set())
+        copy = next(ordinal for ordinal in itertools.count() if ordinal not in used)
+        used.add(copy)
+        yield AccountData(token, index, proxy, copy)
+
+# Build accounts batch by batch only as the startup pipeline asks for them, restoring saved state and adding each batch to `accounts`;
+# spare proxies are registered once the source is exhausted, so none is handed out while its own account is still unbuilt
+def stream_accounts(account_source, accounts, state_store=None, spare_proxies=()):
+    restored = 0
+    account_source = iter(account_source)
+
+    while batch := list(itertools.islice(account_source, LOAD_BATCH_SIZE)):
+        if state_store:
+            restored += restore_accounts(state_store, batch)
+        proxy_pool.configure([], batch)
+        accounts.extend(batch)
+        for account in batch:
+            expect_first_ping(account)
+        yield from batch
+
+    proxy_pool.configure(spare_proxies)
+    mark_fleet_loaded()
+    if state_store:
+        logger.info(f"{Fore.CYAN}00{Fore.RESET} - 已从状态文件恢复 {restored}/{len(accounts)} 个账户")
+
+# Periodically save account state so a restart can resume without re-syncing
+async def persist_state(accounts, state_store):
+    while True:
+        await asyncio.sleep(STATE_FLUSH_INTERVAL)
+        try:
+            await state_store.save(accounts)
+        except Exception as e:
+            logger.error(f"{Fore.CYAN}00{Fore.RESET} - {Fore.RED}保存账户状态时出错: {e}{Fore.RESET}")
+
+# Take one account from activation to its ping loop without waiting for the rest of the fleet; returns whether its saved profile still needs a refresh
+async def start_account(account, claim_scheduler=None):
     try:
-        startup_art()
-        setup_logging()
+        if ACTIVATE_ACCOUNTS and account.status_connect != CONNECTION_STATES["CONNECTED"]:
+            await activate_accounts(account)
 
-        proxies = get_proxy_choice()
-        tokens = await load_tokens()
+        # Pings need the uid; a stale saved one is good enough to start with and is refreshed later
+        if claim_scheduler is not None and not account.uid:
+            await process_account(account)
 
-        logger.info(f"{Fore.CYAN}00{Fore.RESET} - {'正在使用代理...' if proxies else '未使用代理...'}")
+    # Scheduled even when a step above raised, so the account is still pinged and the claim scheduler retries its profile
+    finally:
+        if account.status_connect != CONNECTION_STATES["DISCONNECTED"]:
+            account.started_at = time.time()
+            if claim_scheduler is not None:
+                claim_scheduler.add(account)
+            schedule_account(account)
 
-        token_proxy_pairs = assign_proxies(tokens, proxies)
-        accounts = [AccountData(token, index, proxy) for index, (token, proxy) in enumerate(token_proxy_pairs, start=1)]
+    # Retired while starting up
+    if account.status_connect == CONNECTION_STATES["DISCONNECTED"]:
+        return False
+    return claim_scheduler is not None and account.synced_at is not None and not is_fresh(account)
 
-        if ACTIVATE_ACCOUNTS:
-            await activate_accounts(accounts)
+# Run the startup pipeline over accounts with bounded concurrency, then refresh stale saved profiles
+async def start_accounts(accounts, claim_scheduler=None, concurrency=STARTUP_CONCURRENCY):
+    pending = iter(accounts)
+    stale = []
 
-        while True:
+    # Workers share one iterator, so each account is started exactly once and the next begins as soon as a slot frees up
+    async def worker():
+        for account in pending:
             try:
-                if DAILY_CLAIM:
-                    processed_tokens.clear()
-                    logger.info(f"{Fore.CYAN}00{Fore.RESET} - 正在加载账户详情，检查奖励并领取。请稍候...")
-                    await asyncio.sleep(3)
+                if await start_account(account, claim_scheduler):
+                    stale.append(account)
+            except Exception as e:
+                logger.error(f"{Fore.CYAN}{account.index:02d}{Fore.RESET} - {Fore.RED}启动账户时出错: {e}{Fore.RESET}")
+        while stale:
+            await process_account(stale.pop())
 
-                    tasks = [asyncio.create_task(process_account(account)) for account in accounts]
-                    results = await asyncio.gather(*tasks, return_exceptions=True)
+    await asyncio.gather(*(worker() for _ in range(max(concurrency, 1))))
 
-                    for result in results:
-                        if isinstance(result, Exception):
-                            logger.error(f"{Fore.CYAN}00{Fore.RESET} - {Fore.RED}处理账户时出错: {result}{Fore.RESET}")
+# Join new (index, token, proxy) entries to the running fleet
+def add_accounts(entries, accounts, claim_scheduler=None):
+    new_accounts = list(build_accounts(entries, accounts))
+    proxy_pool.configure([], new_accounts)
+    accounts.extend(new_accounts)
 
-                logger.info(f"{Fore.CYAN}00{Fore.RESET} - 准备发送 ping 请求，请稍候...")
-                await asyncio.sleep(3)
+    task = asyncio.create_task(start_accounts(new_accounts, claim_scheduler, len(new_accounts)))
+    startup_tasks.add(task)
+    task.add_done_callback(startup_tasks.discard)
 
-                await ping_all_accounts(accounts)
+# Take an account out of the running fleet; the schedulers drop it when it next comes due
+def retire_account(account, accounts, claim_scheduler=None):
+    account.status_connect = CONNECTION_STATES["DISCONNECTED"]
+    accounts.remove(account)
+    proxy_pool.detach(account)
+    discard_first_ping(account)
+
+    survivors = [other for other in accounts if other.token == account.token]
+    if not survivors:
+        processed_tokens.discard(account.token)
+    if claim_scheduler is not None:
+        claim_scheduler.remove(account)
+        for other in survivors:
+            claim_scheduler.add(other)
+
+    logger.info(f"{Fore.CYAN}{account.index:02d}{Fore.RESET} - {Fore.YELLOW}账户已移除{Fore.RESET}")
+
+# Start every account through its own activate → sync → ping pipeline while the ping loop runs, claiming rewards as they come due;
+# accounts are built from account_source as the pipeline reaches them and collected in `accounts`
+async def run_accounts(account_source, accounts, state_store=None, watch=False, proxies=(), dashboard=False):
+    background = set()
+    loaded = asyncio.Event()
+    if state_store:
+        background.add(asyncio.create_task(persist_state(accounts, state_store)))
+    if dashboard:
+        background.add(asyncio.create_task(Dashboard(accounts).run()))
+
+    claim_scheduler = None
+
+    try:
+        if DAILY_CLAIM:
+            processed_tokens.clear()
+            claim_scheduler = ClaimScheduler()
+            background.add(asyncio.create_task(claim_scheduler.run()))
 
+        def load():
+            yield from stream_accounts(account_source, accounts, state_store, proxies)
+            loaded.set()
+
+        # Accounts join the ping scheduler one by one as their startup finishes, instead of after the whole fleet
+        mark_fleet_start()
+        logger.info(f"{Fore.CYAN}00{Fore.RESET} - 正在启动账户，每个账户准备就绪后立即开始 ping...")
+        background.add(asyncio.create_task(start_accounts(load(), claim_scheduler)))
+
+        # Apply edits to tokens.txt, proxies.txt and .env while running, once every account from the files is loaded
+        async def watch_files():
+            await loaded.wait()
+            reloader = FleetReloader(
+                accounts, proxies,
+                lambda entries: add_accounts(entries, accounts, claim_scheduler),
+                lambda account: retire_account(account, accounts, claim_scheduler),
+            )
+            await reloader.run()
+
+        if watch:
+            background.add(asyncio.create_task(watch_files()))
+
+        while True:
+            try:
+                await ping_all_accounts(accounts)
             except Exception as e:
                 logger.error(f"{Fore.CYAN}00{Fore.RESET} - {Fore.RED}主循环中出现意外错误: {e}{Fore.RESET}")
 
+    finally:
+        for task in background:
+            task.cancel()
+        if state_store:
+            await state_store.save(accounts)
+            state_store.close()
+
+# Main function to manage the application flow
+async def process():
+    try:
+        startup_art()
+        setup_logging()
+        log_runtime()
+        start_instrumentation()
+        await start_metrics_server(METRICS_PORT)
+
+        proxies = get_proxy_choice()
+        if PROXY_CHECK:
+            proxies = await prevalidate_proxies(proxies)
+        tokens = iter_tokens()
+
+        logger.info(f"{Fore.CYAN}00{Fore.RESET} - {f'正在使用 {len(proxies)} 个代理...' if proxies else '未使用代理...'}")
+
+        entries = ((index, token, proxy) for index, (token, proxy) in enumerate(assign_proxies(tokens, proxies), start=1))
+        state_store = open_state_store()
+        accounts = []
+
+        await run_accounts(build_accounts(entries), accounts, state_store, watch=True, proxies=proxies, dashboard=DASHBOARD)
+
     except asyncio.CancelledError:
         logger.info(f"{Fore.CYAN}00{Fore.RESET} - {Fore.RED}进程中断，正在清理...{Fore.RESET}")
     finally:
@@ -0,0 +1,96 @@
+import asyncio
+import heapq
+import signal
+import sys
+import time
+
+from utils.network import endpoint_selector
+from utils.services import proxy_pool
+from utils.services.metrics import ping_totals, earning_totals, proxy_label
+from utils.settings import CONNECTION_STATES, DASHBOARD_REFRESH, Fore, Style
+
+
+# Rows shown in the worst-proxy table and in the per-account detail view
+WORST_PROXIES = 5
+DETAIL_ROWS = 30
+# Clear the screen and move the cursor home before each frame
+CLEAR_SCREEN = "\033[H\033[J"
+
+# Number of accounts in each CONNECTION_STATES value, kept current by AccountData.status_connect
+state_counts = {state: 0 for state in CONNECTION_STATES.values()}
+
+
+# Live summary of the whole fleet, redrawn at a fixed rate from running counters
+class Dashboard:
+    def __init__(self, accounts, refresh=DASHBOARD_REFRESH):
+        self.accounts = accounts
+        self.refresh = refresh
+        self.show_detail = False
+        self.started = time.monotonic()
+        self.last_total = 0
+        self.last_time = self.started
+
+    # SIGUSR1 toggles the per-account detail view
+    def toggle_detail(self):
+        self.show_detail = not self.show_detail
+
+    # p50/p95 ping latency over the recent samples of every ping endpoint
+    def latency_percentiles(self):
+        samples = sorted(sample for stats in endpoint_selector.stats.values() for sample in stats.samples)
+        if not samples:
+            return None, None
+        return samples[len(samples) // 2], samples[min(int(len(samples) * 0.95), len(samples) - 1)]
+
+    def render(self):
+        now = time.monotonic()
+        succeeded, failed = ping_totals["success"], ping_totals["failure"]
+        total = succeeded + failed
+        rate = (total - self.last_total) / max(now - self.last_time, 1e-6)
+        self.last_total, self.last_time = total, now
+
+        p50, p95 = self.latency_percentiles()
+        states = "  ".join(f"{name}: {state_counts[value]}" for name, value in CONNECTION_STATES.items())
+
+        lines = [
+            f"{Fore.LIGHTCYAN_EX}{Style.BRIGHT}NodepayBot{Style.RESET_ALL}  运行 {int(now - self.started)} 秒  (kill -USR1 切换账户详情)",
+            "",
+            f"账户   {states}",
+            f"Ping   总计 {total}  成功率 {succeeded / total * 100 if total else 0:.1f}%  {rate:.1f} 次/秒",
+            f"延迟   p50 {f'{p50:.3f}s' if p50 is not None else '-'}  p95 {f'{p95:.3f}s' if p95 is not None else '-'}",
+            f"积分   总收益 {earning_totals['total_earning']:.2f}  今日 {earning_totals['today_earning']:.2f}",
+            "",
+            "最差代理",
+        ]
+
+        worst = heapq.nsmallest(WORST_PROXIES, proxy_pool.health.values(), key=lambda health: (health.success_rate, -health.failures))
+        for health in worst:
+            if not health.failures:
+                break
+            status = f"{Fore.RED}隔离中{Fore.RESET}" if health.is_quarantined() else "可用"
+            lines.append(f"  {proxy_label(health.proxy):<28} 成功率 {health.success_rate * 100:5.1f}%  失败 {health.failures:<5} {status}")
+
+        if self.show_detail:
+            lines += ["", "账户详情 (成功率最低)"]
+            for account in heapq.nsmallest(DETAIL_ROWS, self.accounts, key=lambda account: account.browser.successful_pings / (account.browser.ping_count or 1)):
+                browser = account.browser
+                lines.append(f"  {account.index:>5}  Ping {browser.successful_pings}/{browser.ping_count}  分数 {browser.score:<6} 代理 {proxy_label(account.proxy)}")
+
+        return "\n".join(lines)
+
+    async def run(self):
+        loop = asyncio.get_running_loop()
+        try:
+            loop.add_signal_handler(signal.SIGUSR1, self.toggle_detail)
+        except (AttributeError, NotImplementedError, RuntimeError):
+            pass
+
+        try:
+            while True:
+                sys.stdout.write(CLEAR_SCREEN + self.render() + "\n")
+                sys.stdout.flush()
+                await asyncio.sleep(self.refresh)
+        finally:
+            try:
+                loop.remove_signal_handler(signal.SIGUSR1)
+            except (AttributeError, NotImplementedError, RuntimeError):
+                pass
@@ -0,0 +1,178 @@
+import asyncio
+import os
+import signal
+
+from collections import Counter
+
+from utils.services import load_proxies, prevalidate_proxies, proxy_pool
+from utils.services.token_manager import load_stats, read_tokens
+from utils.settings import PROXY_CHECK, RELOAD_INTERVAL, TOKENS_FILE, PROXIES_FILE, config, reload_settings, logger, Fore
+
+
+# Watches tokens.txt, proxies.txt and .env, applying changes to the running fleet without a restart
+class FleetReloader:
+    def __init__(self, accounts, proxies, add_accounts, retire_account, token_path=TOKENS_FILE, proxy_path=PROXIES_FILE, interval=RELOAD_INTERVAL):
+        self.accounts = accounts
+        self.use_proxies = bool(proxies)
+        self.proxies = list(proxies)
+        self.add_accounts = add_accounts
+        self.retire_account = retire_account
+        self.paths = {"settings": config.dotenv_path, "proxies": proxy_path, "tokens": token_path}
+        self.mtimes = {name: self.mtime(path) for name, path in self.paths.items()}
+        self.interval = interval
+        self.next_index = max((account.index for account in accounts), default=0) + 1
+        self.held = 0
+        self.requested = asyncio.Event()
+
+    @staticmethod
+    def mtime(path):
+        try:
+            return os.stat(path).st_mtime_ns
+        except OSError:
+            return None
+
+    # SIGHUP reloads every file, changed or not
+    def request_reload(self):
+        self.requested.set()
+
+    # Files whose modification time changed since the last check
+    def changed_files(self):
+        changed = set()
+        for name, path in self.paths.items():
+            mtime = self.mtime(path)
+            if mtime != self.mtimes[name]:
+                self.mtimes[name] = mtime
+                changed.add(name)
+        return changed
+
+    async def run(self):
+        loop = asyncio.get_running_loop()
+        try:
+            loop.add_signal_handler(signal.SIGHUP, self.request_reload)
+        except (AttributeError, NotImplementedError, RuntimeError):
+            pass
+
+        try:
+            while True:
+                try:
+                    await asyncio.wait_for(self.requested.wait(), self.interval or None)
+                except asyncio.TimeoutError:
+                    pass
+
+                forced = self.requested.is_set()
+                self.requested.clear()
+                changed = self.changed_files()
+                if forced:
+                    changed = set(self.paths)
+                    logger.info(f"{Fore.CYAN}00{Fore.RESET} - 收到 SIGHUP，正在重新加载配置...")
+
+                try:
+                    await self.reload(changed)
+                except Exception as e:
+                    logger.error(f"{Fore.CYAN}00{Fore.RESET} - {Fore.RED}重新加载配置时出错: {e}{Fore.RESET}")
+        finally:
+            try:
+                loop.remove_signal_handler(signal.SIGHUP)
+            except (AttributeError, NotImplementedError, RuntimeError):
+                pass
+
+    async def reload(self, changed):
+        if "settings" in changed:
+            for name, value in reload_settings().items():
+                logger.info(f"{Fore.CYAN}00{Fore.RESET} - {Fore.GREEN}{name} 已更新为 {value}{Fore.RESET}")
+        if "proxies" in changed and self.use_proxies:
+            await self.reload_proxies()
+        # New tokens held back for lack of a spare proxy are retried once proxies change
+        if "tokens" in changed or ("proxies" in changed and self.held):
+            self.reload_tokens()
+
+    # Move an account to another proxy
+    def move(self, account, proxy):
+        proxy_pool.detach(account)
+        account.proxy = proxy
+        proxy_pool.attach(account)
+
+    # Add new proxies as spares and move accounts off proxies that were removed from the file
+    async def reload_proxies(self):
+        proxies = load_proxies(self.paths["proxies"])
+        if not proxies:
+            logger.warning(f"{Fore.CYAN}00{Fore.RESET} - {Fore.YELLOW}{self.paths['proxies']} 为空，保留当前代理{Fore.RESET}")
+            return
+
+        known = set(self.proxies)
+        added = [proxy for proxy in proxies if proxy not in known]
+        removed = known - set(proxies)
+
+        # New proxies join in the order the check returns them, which puts failed ones last or leaves them out
+        if added and PROXY_CHECK:
+            added = await prevalidate_proxies(added)
+            proxies = [proxy for proxy in proxies if proxy in known] + added
+
+        self.proxies = proxies
+        proxy_pool.configure(added)
+
+        # Accounts without a spare stay on their removed proxy rather than falling back to a direct connection
+        moved = kept = 0
+        if removed:
+            for proxy in removed:
+                proxy_pool.remove(proxy)
+            for account in self.accounts:
+                if account.proxy in removed:
+                    spare = proxy_pool.find_spare(account.token)
+                    if spare is None:
+                        kept += 1
+                        continue
+                    self.move(account, spare)
+                    moved += 1
+
+        logger.info(f"{Fore.CYAN}00{Fore.RESET} - 代理已重新加载: 新增 {len(added)} 个，移除 {len(removed)} 个，{moved} 个账户已更换代理")
+        if kept:
+            logger.warning(f"{Fore.CYAN}00{Fore.RESET} - {Fore.YELLOW}没有可用的备用代理，{kept} 个账户继续使用已移除的代理{Fore.RESET}")
+
+    # Retire accounts whose tokens were removed and start accounts for new tokens, leaving the rest untouched
+    def reload_tokens(self):
+        try:
+            with open(self.paths["tokens"], 'r') as file:
+                load_stats.update(tokens=0, duplicate_tokens=0, invalid_tokens=0)
+                wanted = list(read_tokens(file))
+        except OSError as e:
+            logger.error(f"{Fore.CYAN}00{Fore.RESET} - {Fore.RED}重新加载 Token 失败: {e}{Fore.RESET}")
+            return
+
+        # An empty file is more likely a save in progress than a request to stop every account
+        if not wanted:
+            logger.warning(f"{Fore.CYAN}00{Fore.RESET} - {Fore.YELLOW}{self.paths['tokens']} 为空，保留当前账户{Fore.RESET}")
+            return
+
+        wanted_counts = Counter(wanted)
+        live_counts = Counter(account.token for account in self.accounts)
+
+        # Retire the newest copies first so the longest-running connections are kept
+        retired = []
+        for account in sorted(self.accounts, key=lambda account: account.index, reverse=True):
+            if live_counts[account.token] > wanted_counts[account.token]:
+                live_counts[account.token] -= 1
+                retired.append(account)
+        for account in retired:
+            self.retire_account(account)
+
+        # Added one at a time so each new account's proxy counts as taken before the next spare is picked;
+        # when proxies are in use and none is spare the token is held back instead of connecting directly
+        added = held = 0
+        for token in wanted:
+            if live_counts[token] < wanted_counts[token]:
+                live_counts[token] += 1
+                proxy = proxy_pool.find_spare(token) if self.use_proxies else None
+                if self.use_proxies and proxy is None:
+                    held += 1
+                    continue
+                self.add_accounts([(self.next_index, token, proxy)])
+                self.next_index += 1
+                added += 1
+
+        self.held = held
+        if retired or added:
+            logger.info(f"{Fore.CYAN}00{Fore.RESET} - Token 已重新加载: 新增 {added} 个账户，移除 {len(retired)} 个账户")
+        if held:
+            logger.warning(f"{Fore.CYAN}00{Fore.RESET} - {Fore.YELLOW}没有可用的备用代理，{held} 个新账户暂不启动，"
+                           f"添加代理后将自动启动{Fore.RESET}")
@@ -0,0 +1,203 @@
+import asyncio
+import multiprocessing
+import queue
+import signal
+import time
+
+from utils.core.account import build_accounts, run_accounts, collect_stats, clean_up_resources
+from utils.services import get_proxy_choice, assign_proxies, iter_tokens, open_state_store, prevalidate_proxies
+from utils.services import start_metrics_server, start_instrumentation, log_runtime
+from utils.services.fast_mode import run
+from utils.services.token_manager import load_stats
+from utils.settings import PING_INTERVAL, PROXY_CHECK, WORKERS, METRICS_PORT, logger, Fore, setup_logging, startup_art
+
+
+# Seconds between stats reports sent from each worker
+STATS_INTERVAL = 10
+# Restart backoff bounds for crashed workers
+RESTART_DELAY = 2
+MAX_RESTART_DELAY = 60
+
+
+# Split streamed (index, token, proxy) entries round-robin by token into at most `count` non-empty shards; every copy
+# of a token goes to the same shard, so copies are numbered the same as in one process and share its processed tokens
+def split_shards(entries, count):
+    shards = [[] for _ in range(count)]
+    token_shards = {}
+    for index, token, proxy in entries:
+        shard = token_shards.setdefault(token, len(token_shards) % count)
+        shards[shard].append((index, token, proxy))
+    return [shard for shard in shards if shard]
+
+# Periodically push this worker's aggregated counters to the supervisor
+async def report_stats(shard_id, accounts, stats_queue):
+    while True:
+        await asyncio.sleep(STATS_INTERVAL)
+        try:
+            stats_queue.put_nowait((shard_id, collect_stats(accounts)))
+        except queue.Full:
+            pass
+
+# Run one shard of accounts on this process's own event loop
+async def run_shard(shard_id, shard, spare_proxies, stats_queue):
+    main_task = asyncio.current_task()
+    try:
+        asyncio.get_running_loop().add_signal_handler(signal.SIGTERM, main_task.cancel)
+    except (NotImplementedError, RuntimeError):
+        pass
+
+    accounts = []
+    reporter = asyncio.create_task(report_stats(shard_id, accounts, stats_queue))
+
+    try:
+        start_instrumentation()
+        # Each worker serves its own shard's metrics on consecutive ports
+        await start_metrics_server(METRICS_PORT and METRICS_PORT + shard_id)
+        state_store = open_state_store()
+        await run_accounts(build_accounts(shard), accounts, state_store, proxies=spare_proxies)
+    except asyncio.CancelledError:
+        logger.info(f"{Fore.CYAN}00{Fore.RESET} - 工作进程 {shard_id} 正在停止...")
+    finally:
+        reporter.cancel()
+        await clean_up_resources()
+
+# Entry point of a worker process
+def worker_main(shard_id, shard, spare_proxies, stats_queue):
+    # Ctrl+C is handled by the supervisor, which stops workers itself
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    setup_logging(shard_id)
+
+    try:
+        run(run_shard(shard_id, shard, spare_proxies, stats_queue))
+    except (KeyboardInterrupt, SystemExit):
+        pass
+
+# Supervises worker processes: restarts crashed ones and aggregates their stats
+class Supervisor:
+    def __init__(self, shards, spare_proxies=()):
+        self.shards = shards
+        self.spare_proxies = [list(spare_proxies)[i::len(shards)] for i in range(len(shards))]
+        self.stats_queue = multiprocessing.Queue(maxsize=len(shards) * 100)
+        self.workers = {}
+        self.restart_at = {}
+        self.restart_delay = {shard_id: RESTART_DELAY for shard_id in range(len(shards))}
+        self.stats = {}
+        self.stopping = False
+
+    def spawn(self, shard_id):
+        worker = multiprocessing.Process(
+            target=worker_main,
+            args=(shard_id, self.shards[shard_id], self.spare_proxies[shard_id], self.stats_queue),
+            name=f"nodepay-worker-{shard_id}",
+            daemon=True,
+        )
+        worker.start()
+        self.workers[shard_id] = (worker, time.monotonic())
+        logger.info(f"{Fore.CYAN}00{Fore.RESET} - 工作进程 {shard_id} 已启动 (PID {worker.pid}，账户 {len(self.shards[shard_id])})")
+
+    # Restart workers that exited, backing off when they keep crashing
+    def check_workers(self):
+        now = time.monotonic()
+        for shard_id, (worker, started) in list(self.workers.items()):
+            if worker.is_alive():
+                # Reset the backoff once a worker has stayed up for a while
+                if now - started > MAX_RESTART_DELAY:
+                    self.restart_delay[shard_id] = RESTART_DELAY
+                continue
+
+            if shard_id not in self.restart_at:
+                delay = self.restart_delay[shard_id]
+                self.restart_at[shard_id] = now + delay
+                self.restart_delay[shard_id] = min(delay * 2, MAX_RESTART_DELAY)
+                logger.error(f"{Fore.CYAN}00{Fore.RESET} - {Fore.RED}工作进程 {shard_id} 已退出 (代码 {worker.exitcode})，{delay} 秒后重启{Fore.RESET}")
+
+            elif now >= self.restart_at[shard_id]:
+                del self.restart_at[shard_id]
+                self.spawn(shard_id)
+
+    def drain_stats(self):
+        while True:
+            try:
+                shard_id, stats = self.stats_queue.get_nowait()
+            except queue.Empty:
+                return
+            self.stats[shard_id] = stats
+
+    def log_stats(self):
+        total = {"accounts": 0, "connected": 0, "ping_count": 0, "successful_pings": 0, "score": 0}
+        for stats in self.stats.values():
+            for key in total:
+                total[key] += stats.get(key, 0)
+
+        alive = sum(worker.is_alive() for worker, _ in self.workers.values())
+        logger.info(
+            f"{Fore.CYAN}00{Fore.RESET} - 工作进程 {alive}/{len(self.shards)} 运行中，"
+            f"已连接 {total['connected']}/{total['accounts']}，"
+            f"Ping {total['successful_pings']}/{total['ping_count']}，分数 {total['score']}"
+        )
+
+    def run(self):
+        for shard_id in range(len(self.shards)):
+            self.spawn(shard_id)
+
+        next_report = time.monotonic() + PING_INTERVAL
+        while not self.stopping:
+            time.sleep(1)
+            self.drain_stats()
+            self.check_workers()
+
+            if time.monotonic() >= next_report:
+                next_report = time.monotonic() + PING_INTERVAL
+                self.log_stats()
+
+    # Stop every worker together, escalating to kill if they do not exit
+    def shutdown(self, timeout=10):
+        self.stopping = True
+        workers = [worker for worker, _ in self.workers.values()]
+
+        for worker in workers:
+            if worker.is_alive():
+                worker.terminate()
+
+        deadline = time.monotonic() + timeout
+        for worker in workers:
+            worker.join(max(deadline - time.monotonic(), 0))
+            if worker.is_alive():
+                worker.kill()
+                worker.join()
+
+        self.drain_stats()
+        self.log_stats()
+        logger.info(f"{Fore.CYAN}00{Fore.RESET} - {Fore.GREEN}所有工作进程已停止{Fore.RESET}")
+
+# Translate SIGTERM into the same shutdown path as Ctrl+C
+def raise_interrupt(signum, frame):
+    raise KeyboardInterrupt
+
+# Split accounts across WORKERS processes and supervise them
+def run_supervisor(workers=WORKERS):
+    startup_art()
+    setup_logging()
+    log_runtime()
+
+    proxies = get_proxy_choice()
+    if PROXY_CHECK:
+        proxies = run(prevalidate_proxies(proxies))
+    tokens = iter_tokens()
+
+    logger.info(f"{Fore.CYAN}00{Fore.RESET} - {f'正在使用 {len(proxies)} 个代理...' if proxies else '未使用代理...'}")
+
+    entries = ((index, token, proxy) for index, (token, proxy) in enumerate(assign_proxies(tokens, proxies), start=1))
+    shards = split_shards(entries, max(workers, 1))
+
+    # Proxies left over after pairing stay available to each shard as failover spares
+    supervisor = Supervisor(shards, proxies[load_stats["tokens"]:])
+
+    signal.signal(signal.SIGTERM, raise_interrupt)
+
+    try:
+        supervisor.run()
+    except (KeyboardInterrupt, SystemExit):
+        logger.info(f"{Fore.CYAN}00{Fore.RESET} - {Fore.RED}进程中断，正在停止工作进程...{Fore.RESET}")
+    finally:
+        supervisor.shutdown()
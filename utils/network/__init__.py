@@ -1,2 +1,5 @@
-from .ping_manager import ping_all_accounts
-from .reward_manager import get_profile_info
\ No newline at end of file
+from .ping_manager import ping_all_accounts, schedule_account
+from .reward_manager import get_profile_info
+from .ping_scheduler import PingScheduler
+from .claim_scheduler import ClaimScheduler
+from .ping_endpoints import endpoint_selector
@@ -0,0 +1,87 @@
+import asyncio
+import heapq
+import itertools
+import time
+
+from utils.services import processed_tokens
+from utils.settings import CLAIM_CONCURRENCY, CONNECTION_STATES, config, logger, Fore
+from utils.network.reward_manager import get_profile_info, process_and_claim_rewards
+
+
+# Delay before retrying an account whose profile or mission fetch failed
+RETRY_DELAY = 300
+# Fractional part of the golden ratio, spreads first checks evenly over the ping interval
+GOLDEN_RATIO = 0.6180339887498949
+
+
+# Checks and claims each account's rewards only when the next one is due
+class ClaimScheduler:
+    def __init__(self, concurrency=CLAIM_CONCURRENCY):
+        self.semaphore = asyncio.Semaphore(concurrency)
+        self.queue = []
+        self.counter = itertools.count()
+        self.tokens = {}
+        self.in_flight = set()
+        self.wakeup = asyncio.Event()
+
+    # Queue an account once per token, at its next claim time or staggered over the ping interval;
+    # a copy of the token that has its uid replaces a queued copy that skipped the profile fetch and has none
+    def add(self, account, due=None):
+        seq = next(self.counter)
+        if due is None:
+            queued = self.tokens.get(account.token)
+            if queued is not None and (queued.uid or not account.uid):
+                return
+            self.tokens[account.token] = account
+            due = account.next_claim_time or time.time() + (seq * GOLDEN_RATIO % 1) * config.PING_INTERVAL
+
+        heapq.heappush(self.queue, (due, seq, account))
+        self.wakeup.set()
+
+    # Forget a retired account's token so another account with the same token can take its place
+    def remove(self, account):
+        if self.tokens.get(account.token) is account:
+            del self.tokens[account.token]
+
+    # Claim due rewards for one account, re-fetching its profile first if that never succeeded
+    async def dispatch(self, account):
+        account.next_claim_time = None
+        try:
+            async with self.semaphore:
+                if account.uid:
+                    await process_and_claim_rewards(account)
+                else:
+                    processed_tokens.discard(account.token)
+                    await get_profile_info(account)
+
+        except Exception as e:
+            logger.error(f"{Fore.CYAN}{account.index:02d}{Fore.RESET} - {Fore.RED}领取奖励时出错: {e}{Fore.RESET}")
+
+        finally:
+            if account.status_connect != CONNECTION_STATES["DISCONNECTED"] and self.tokens.get(account.token) is account:
+                self.add(account, account.next_claim_time or time.time() + RETRY_DELAY)
+
+    # Dispatch accounts as their rewards come due, until cancelled
+    async def run(self):
+        try:
+            while True:
+                now = time.time()
+                while self.queue and self.queue[0][0] <= now:
+                    _, _, account = heapq.heappop(self.queue)
+                    # Retired, or replaced by another copy of its token
+                    if account.status_connect == CONNECTION_STATES["DISCONNECTED"] or self.tokens.get(account.token) is not account:
+                        continue
+                    task = asyncio.create_task(self.dispatch(account))
+                    self.in_flight.add(task)
+                    task.add_done_callback(self.in_flight.discard)
+
+                self.wakeup.clear()
+                timeout = self.queue[0][0] - time.time() if self.queue else None
+                try:
+                    await asyncio.wait_for(self.wakeup.wait(), timeout)
+                except asyncio.TimeoutError:
+                    pass
+
+        finally:
+            for task in self.in_flight:
+                task.cancel()
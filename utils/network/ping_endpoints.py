@@ -0,0 +1,116 @@
+import asyncio
+import time
+
+from collections import deque
+
+from utils.services import retry_request, breaker_remaining
+from utils.settings import DOMAIN_API, PING_HEDGE_PERCENTILE, DEBUG, logger, Fore
+
+
+# Weight of the newest sample in the latency and error moving averages
+EWMA_ALPHA = 0.2
+# Latency samples kept per endpoint for the hedging percentile
+SAMPLE_WINDOW = 200
+# Samples required before an endpoint's percentile is trusted for hedging
+MIN_SAMPLES = 20
+# How strongly the error rate inflates an endpoint's effective latency
+ERROR_PENALTY = 4
+
+
+# Latency and error statistics for one ping endpoint
+class EndpointStats:
+    __slots__ = ('url', 'latency', 'error_rate', 'samples')
+
+    def __init__(self, url):
+        self.url = url
+        self.latency = None
+        self.error_rate = 0.0
+        self.samples = deque(maxlen=SAMPLE_WINDOW)
+
+    # Effective latency used for ranking; endpoints without data rank first so they get measured
+    @property
+    def score(self):
+        if self.latency is None:
+            return 0.0
+        return self.latency * (1 + ERROR_PENALTY * self.error_rate)
+
+    def percentile(self, percent):
+        if len(self.samples) < MIN_SAMPLES:
+            return None
+        ordered = sorted(self.samples)
+        return ordered[min(int(len(ordered) * percent / 100), len(ordered) - 1)]
+
+
+# Ranks ping endpoints by EWMA latency and error rate
+class EndpointSelector:
+    def __init__(self, urls):
+        self.stats = {url: EndpointStats(url) for url in urls}
+
+    def ranked(self):
+        return [stats.url for stats in sorted(self.stats.values(), key=lambda stats: stats.score)]
+
+    # Record a finished attempt; ok=None records latency only (a hedged attempt that was cancelled)
+    def record(self, url, latency, ok=None):
+        stats = self.stats.get(url)
+        if stats is None:
+            return
+
+        stats.latency = latency if stats.latency is None else stats.latency + EWMA_ALPHA * (latency - stats.latency)
+        stats.samples.append(latency)
+        if ok is not None:
+            stats.error_rate += EWMA_ALPHA * ((0.0 if ok else 1.0) - stats.error_rate)
+
+    # Seconds to wait on an endpoint before hedging with the next one
+    def hedge_delay(self, url):
+        stats = self.stats.get(url)
+        return stats.percentile(PING_HEDGE_PERCENTILE) if stats else None
+
+
+endpoint_selector = EndpointSelector(DOMAIN_API["PING"])
+
+
+# Seconds until some ping endpoint accepts requests again (0 while at least one host's breaker is not open)
+def ping_pause():
+    return min(breaker_remaining(url) for url in endpoint_selector.stats)
+
+
+# Send a ping to one endpoint through retry_request and record how it went
+async def ping_endpoint(url, data, account):
+    started = time.monotonic()
+    try:
+        response = await retry_request(url, data, account)
+    except asyncio.CancelledError:
+        endpoint_selector.record(url, time.monotonic() - started)
+        raise
+
+    endpoint_selector.record(url, time.monotonic() - started, response is not None)
+    return response, url
+
+# Ping the best endpoint, hedging with the runner-up once the first exceeds its latency percentile
+async def hedged_ping(urls, data, account):
+    primary = urls[0]
+    secondary = urls[1] if len(urls) > 1 else None
+    delay = endpoint_selector.hedge_delay(primary) if secondary else None
+
+    first = asyncio.create_task(ping_endpoint(primary, data, account))
+    if delay is None:
+        return (*await first, {primary})
+
+    done, _ = await asyncio.wait({first}, timeout=delay)
+    if done:
+        return (*first.result(), {primary})
+
+    if DEBUG:
+        logger.debug(f"{Fore.CYAN}{account.index:02d}{Fore.RESET} - Ping 超过 {delay:.2f} 秒，对冲发送到 {secondary}")
+    pending = {first, asyncio.create_task(ping_endpoint(secondary, data, account))}
+    try:
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                response, url = task.result()
+                if response is not None:
+                    return response, url, {primary, secondary}
+        return None, primary, {primary, secondary}
+    finally:
+        for task in pending:
+            task.cancel()
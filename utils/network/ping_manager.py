@@ -1,30 +1,34 @@
-import asyncio
 import time
 
-from colorama import Style
 from urllib.parse import urlparse
 
-from utils.services import retry_request, mask_token, resolve_ip
-from utils.settings import DOMAIN_API, PING_DURATION, PING_INTERVAL, logger, Fore
+from utils.services import mask_token, resolve_ip, record_ping, record_first_ping, timed
+from utils.settings import PING_DURATION, DEBUG, config, logger, Fore, Style
+from utils.network.ping_endpoints import endpoint_selector, hedged_ping, ping_pause
+from utils.network.ping_scheduler import PingScheduler
 
 
 # 发送周期性ping请求到服务器
 async def process_ping_response(response, url, account, data):
     if not response or not isinstance(response, dict):
+        record_ping(account, False)
         logger.error(f"{Fore.CYAN}{account.index:02d}{Fore.RESET} - {Fore.RED}无效或为空的响应: {response}{Fore.RESET}")
         return "failed", None
 
     response_data = response.get("data", {})
     if not isinstance(response_data, dict):
+        record_ping(account, False)
         logger.error(f"{Fore.CYAN}{account.index:02d}{Fore.RESET} - {Fore.RED}响应中缺少 'data' 字段: {response_data}{Fore.RESET}")
         return "failed", None
 
-    logger.debug(
-        f"{Fore.CYAN}{account.index:02d}{Fore.RESET} - 响应 {{"
-        f"成功: {response.get('success')}, 代码: {response.get('code')}, "
-        f"IP得分: {response.get('data', {}).get('ip_score', 'N/A')}, "
-        f"消息: {response.get('msg', '无消息')}}}"
-    )
+    # 只在调试模式下构建调试字符串
+    if DEBUG:
+        logger.debug(
+            f"{Fore.CYAN}{account.index:02d}{Fore.RESET} - 响应 {{"
+            f"成功: {response.get('success')}, 代码: {response.get('code')}, "
+            f"IP得分: {response.get('data', {}).get('ip_score', 'N/A')}, "
+            f"消息: {response.get('msg', '无消息')}}}"
+        )
 
     try:
         version = response_data.get("version", "2.2.7")
@@ -33,25 +37,23 @@ async def process_ping_response(response, url, account, data):
         ping_result = "成功" if response.get("code", -1) == 0 else "失败"
         network_quality = response_data.get("ip_score", "N/A")
 
-        account_stats = account.browser_ids[0]
-        account_stats.setdefault("ping_count", 0)
-        account_stats.setdefault("score", 0)
-        account_stats.setdefault("successful_pings", 0)
-
-        account_stats['ping_count'] += 1
+        account_stats = account.browser
+        account_stats.ping_count += 1
         if ping_result == "成功":
-            account_stats['score'] += 10
-            account_stats["successful_pings"] += 1
+            account_stats.score += 10
+            account_stats.successful_pings += 1
         else:
-            account_stats['score'] -= 5
+            account_stats.score -= 5
+        record_ping(account, ping_result == "成功")
 
-        logger.debug(
-            f"{Fore.CYAN}{account.index:02d}{Fore.RESET} - "
-            f"浏览器统计 {{Ping次数: {account.browser_ids[0]['ping_count']}, "
-            f"成功次数: {account.browser_ids[0]['successful_pings']}, "
-            f"分数: {account.browser_ids[0]['score']}, "
-            f"最后Ping时间: {account.browser_ids[0]['last_ping_time']:.2f}}}"
-        )
+        if DEBUG:
+            logger.debug(
+                f"{Fore.CYAN}{account.index:02d}{Fore.RESET} - "
+                f"浏览器统计 {{Ping次数: {account_stats.ping_count}, "
+                f"成功次数: {account_stats.successful_pings}, "
+                f"分数: {account_stats.score}, "
+                f"最后Ping时间: {account_stats.last_ping_time:.2f}}}"
+            )
 
         return ping_result, network_quality
 
@@ -60,84 +62,89 @@ async def process_ping_response(response, url, account, data):
         logger.error(f"{Fore.CYAN}{account.index:02d}{Fore.RESET} - {Fore.RED}处理响应时出错: {short_error}{Fore.RESET}")
         return "failed", None
 
-# 启动每个账户的ping过程
+# 启动每个账户的ping过程，返回本次ping是否成功
+@timed
 async def start_ping(account):
     current_time = time.time()
+    last_ping_time = account.browser.last_ping_time
 
-    separator_line = f"{Fore.CYAN + Style.BRIGHT}-" * 75 + f"{Style.RESET_ALL}"
+    if DEBUG:
+        if account.index == 1:
+            logger.debug(f"{Fore.CYAN + Style.BRIGHT}-" * 75 + f"{Style.RESET_ALL}")
+        logger.debug(f"{Fore.CYAN}{account.index:02d}{Fore.RESET} - 当前时间: {current_time}, 上次ping时间: {last_ping_time}")
 
-    if account.index == 1:
-        logger.debug(separator_line)
-
-    # 验证browser_ids
-    if not account.browser_ids or not isinstance(account.browser_ids[0], dict):
-        logger.error(f"{Fore.CYAN}{account.index:02d}{Fore.RESET} - {Fore.RED}无效或缺失browser_ids结构{Fore.RESET}")
-        return
-
-    account.browser_ids[0].setdefault('ping_count', 0)
-    account.browser_ids[0].setdefault('score', 0)
-
-    last_ping_time = account.browser_ids[0].get('last_ping_time', 0)
-    logger.debug(f"{Fore.CYAN}{account.index:02d}{Fore.RESET} - 当前时间: {current_time}, 上次ping时间: {last_ping_time}")
-
-    if last_ping_time and (current_time - last_ping_time) < PING_INTERVAL:
+    if last_ping_time and (current_time - last_ping_time) < config.PING_INTERVAL:
         logger.warning(f"{Fore.CYAN}{account.index:02d}{Fore.RESET} - {Fore.YELLOW}稍等一下！请稍后再尝试{Fore.RESET}")
-        return
+        return None
+
+    account.browser.last_ping_time = current_time
 
-    account.browser_ids[0]['last_ping_time'] = current_time
+    data = {
+        "id": account.uid,
+        "browser_id": account.browser.to_dict(),
+        "timestamp": int(time.time()),
+    }
 
-    # 开始ping循环
-    for url in DOMAIN_API.get("PING", []):
+    try:
+        return await ping_endpoints(account, data)
+    finally:
+        record_first_ping(account)
+
+# 按延迟和错误率从最佳端点开始尝试，直到某个端点ping成功
+async def ping_endpoints(account, data):
+    remaining = endpoint_selector.ranked()
+    while remaining:
         try:
-            logger.debug(f"{Fore.CYAN}{account.index:02d}{Fore.RESET} - 正在发送ping到 {urlparse(url).path}")
-            data = {
-                "id": account.account_info.get("uid"),
-                "browser_id": account.browser_ids[0],
-                "timestamp": int(time.time()),
-            }
-
-            # 发送请求并处理重试
-            response = await retry_request(url, data, account)
+            if DEBUG:
+                logger.debug(f"{Fore.CYAN}{account.index:02d}{Fore.RESET} - 正在发送ping到 {urlparse(remaining[0]).path}")
+
+            # 发送请求并处理重试，必要时对冲到第二个端点
+            response, url, tried = await hedged_ping(remaining, data, account)
+            remaining = [candidate for candidate in remaining if candidate not in tried]
             if response is None:
                 continue
-        
-            ping_result, network_quality = await process_ping_response(response, url, account, data)
 
-            logger.debug(separator_line)
+            ping_result, network_quality = await process_ping_response(response, url, account, data)
 
-            identifier = await resolve_ip(account)
-            logger.info(
-                f"{Fore.CYAN}{account.index:02d}{Fore.RESET} - "
-                f"{Fore.GREEN if ping_result == '成功' else Fore.RED}Ping {ping_result}{Fore.RESET}, "
-                f"Token: {Fore.CYAN}{mask_token(account.token)}{Fore.RESET}, "
-                f"IP得分: {Fore.CYAN}{network_quality}{Fore.RESET}, "
-                f"{'代理' if account.proxy else 'IP地址'}: {Fore.CYAN}{identifier}{Fore.RESET}"
-            )
+            # 每个账户的结果只在调试模式下输出，常规输出由调度器按轮汇总
+            if DEBUG:
+                identifier = await resolve_ip(account)
+                logger.debug(
+                    f"{Fore.CYAN}{account.index:02d}{Fore.RESET} - "
+                    f"{Fore.GREEN if ping_result == '成功' else Fore.RED}Ping {ping_result}{Fore.RESET}, "
+                    f"Token: {Fore.CYAN}{mask_token(account.token)}{Fore.RESET}, "
+                    f"IP得分: {Fore.CYAN}{network_quality}{Fore.RESET}, "
+                    f"{'代理' if account.proxy else 'IP地址'}: {Fore.CYAN}{identifier}{Fore.RESET}"
+                )
 
             if ping_result == "成功":
-                break
+                return True
 
+        # 出错时 remaining 可能未更新，结束本次ping以免重复尝试同一端点
         except KeyError as ke:
             logger.error(f"{Fore.CYAN}{account.index:02d}{Fore.RESET} - {Fore.RED}Ping过程中发生KeyError: {ke}{Fore.RESET}")
+            break
+        except Exception as e:
+            logger.error(f"{Fore.CYAN}{account.index:02d}{Fore.RESET} - {Fore.RED}Ping过程中出错: {e}{Fore.RESET}")
+            break
 
-# 定期ping所有账户
-async def ping_all_accounts(accounts):
-    start_time = time.time()
-
-    while time.time() - start_time < PING_DURATION:
-        try:
-            # 并发ping所有账户
-            tasks = [start_ping(account) for account in accounts]
-            results = await asyncio.gather(*tasks, return_exceptions=True)
-
-            # 记录ping失败的账户
-            for account, result in zip(accounts, results):
-                if isinstance(result, Exception):
-                    logger.error(f"{Fore.CYAN}{account.index:02d}{Fore.RESET} - {Fore.RED}Ping账户时出错: {result}{Fore.RESET}")
+    return False
 
-        except Exception as e:
-            short_error = str(e).split(". See")[0]
-            logger.error(f"{Fore.CYAN}{account.index:02d}{Fore.RESET} - {Fore.RED}ping_all_accounts中出现意外错误: {short_error}{Fore.RESET}")
+# 当前一轮的调度器，运行中新增的账户会加入其中
+current_scheduler = None
 
-        logger.info(f"{Fore.CYAN}00{Fore.RESET} - 睡眠 {PING_INTERVAL} 秒后开始下一轮")
-        await asyncio.sleep(PING_INTERVAL)
+# 定期ping所有账户，每个账户按自己的计时器错峰发送
+async def ping_all_accounts(accounts):
+    global current_scheduler
+    scheduler = current_scheduler = PingScheduler(start_ping, paused=ping_pause)
+    for account in accounts:
+        # 仍在启动流程中的账户在启动完成后自行加入
+        if account.started_at:
+            scheduler.add(account)
+
+    await scheduler.run(PING_DURATION)
+
+# 让运行中新增的账户立即加入当前一轮，之后的轮次会从账户列表中包含它
+def schedule_account(account):
+    if current_scheduler is not None:
+        current_scheduler.add(account)
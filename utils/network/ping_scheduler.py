@@ -0,0 +1,153 @@
+import asyncio
+import heapq
+import itertools
+import time
+
+from utils.services import log_rate_limit_state, proxy_pool
+from utils.settings import PING_CONCURRENCY, PROXY_CONCURRENCY, CONNECTION_STATES, config, logger, Fore
+
+
+# Fractional part of the golden ratio, spreads any number of accounts evenly over the interval
+GOLDEN_RATIO = 0.6180339887498949
+
+
+# Schedules each account on its own timer with bounded global and per-proxy concurrency
+class PingScheduler:
+    def __init__(self, ping, interval=None, concurrency=PING_CONCURRENCY, proxy_concurrency=PROXY_CONCURRENCY, paused=None):
+        self.ping = ping
+        self.paused = paused
+        self.fixed_interval = interval
+        self.semaphore = asyncio.Semaphore(concurrency)
+        self.proxy_concurrency = proxy_concurrency
+        self.proxy_semaphores = {}
+        self.queue = []
+        self.counter = itertools.count()
+        self.in_flight = set()
+        self.dispatched = 0
+        self.succeeded = 0
+        self.failed = 0
+        self.wakeup = asyncio.Event()
+
+    # Ping interval, following config.PING_INTERVAL when reloaded unless fixed at construction
+    @property
+    def interval(self):
+        return self.fixed_interval or config.PING_INTERVAL
+
+    # Queue an account, following last_ping_time while its next ping is still ahead and staggering it otherwise;
+    # a last_ping_time restored from an earlier run is usually overdue, and following it would fire the fleet at once
+    def add(self, account, due=None):
+        seq = next(self.counter)
+        if due is None:
+            now = time.time()
+            last_ping_time = account.browser.last_ping_time
+            if last_ping_time and last_ping_time + self.interval > now:
+                due = last_ping_time + self.interval
+            else:
+                due = now + (seq * GOLDEN_RATIO % 1) * self.interval
+
+        heapq.heappush(self.queue, (due, seq, account))
+        self.wakeup.set()
+
+    # Spread accounts that came due during a pause over one interval instead of releasing them at once
+    def restagger(self, now):
+        overdue = []
+        while self.queue and self.queue[0][0] <= now:
+            overdue.append(heapq.heappop(self.queue)[2])
+
+        for position, account in enumerate(overdue):
+            self.add(account, now + (position * GOLDEN_RATIO % 1) * self.interval)
+
+    # Semaphore capping concurrent pings through one proxy
+    def proxy_semaphore(self, proxy):
+        semaphore = self.proxy_semaphores.get(proxy)
+        if semaphore is None:
+            semaphore = self.proxy_semaphores[proxy] = asyncio.Semaphore(self.proxy_concurrency)
+        return semaphore
+
+    # Ping one account under the concurrency caps, count the outcome for the round summary, then put it back on its timer
+    async def dispatch(self, account):
+        try:
+            if account.proxy:
+                async with self.proxy_semaphore(account.proxy), self.semaphore:
+                    result = await self.ping(account)
+            else:
+                async with self.semaphore:
+                    result = await self.ping(account)
+
+            if result is True:
+                self.succeeded += 1
+            elif result is False:
+                self.failed += 1
+
+        except Exception as e:
+            logger.error(f"{Fore.CYAN}{account.index:02d}{Fore.RESET} - {Fore.RED}Ping账户时出错: {e}{Fore.RESET}")
+
+        finally:
+            # Accounts that never recorded a ping time retry one interval from now; retired accounts drop out
+            if account.status_connect != CONNECTION_STATES["DISCONNECTED"]:
+                self.add(account, None if account.browser.last_ping_time else time.time() + self.interval)
+
+    # Sleep until the next account is due, waking early when a new account is queued
+    async def wait_until(self, deadline):
+        self.wakeup.clear()
+        timeout = deadline - time.time()
+        if self.queue:
+            timeout = min(timeout, self.queue[0][0] - time.time())
+
+        if timeout > 0:
+            try:
+                await asyncio.wait_for(self.wakeup.wait(), timeout)
+            except asyncio.TimeoutError:
+                pass
+
+    # Dispatch due accounts until the duration elapses, then wait for in-flight pings
+    async def run(self, duration):
+        deadline = time.time() + duration
+        next_report = time.time() + self.interval
+
+        paused = False
+
+        try:
+            while time.time() < deadline:
+                now = time.time()
+
+                # Hold every ping while the API's circuit breakers are open
+                pause = self.paused() if self.paused else 0
+                if pause > 0:
+                    if not paused:
+                        logger.warning(f"{Fore.CYAN}00{Fore.RESET} - {Fore.YELLOW}API 正在失败，暂停 ping {pause:.0f} 秒{Fore.RESET}")
+                    paused = True
+                elif paused:
+                    paused = False
+                    self.restagger(now)
+                else:
+                    while self.queue and self.queue[0][0] <= now:
+                        _, _, account = heapq.heappop(self.queue)
+                        if account.status_connect == CONNECTION_STATES["DISCONNECTED"]:
+                            continue
+                        task = asyncio.create_task(self.dispatch(account))
+                        self.in_flight.add(task)
+                        task.add_done_callback(self.in_flight.discard)
+                        self.dispatched += 1
+
+                if now >= next_report:
+                    next_report = now + self.interval
+                    logger.info(
+                        f"{Fore.CYAN}00{Fore.RESET} - 本轮 Ping {Fore.GREEN}成功 {self.succeeded}{Fore.RESET}，"
+                        f"{Fore.RED}失败 {self.failed}{Fore.RESET}，已调度 {self.dispatched} 次，进行中 {len(self.in_flight)}，排队 {len(self.queue)}"
+                    )
+                    self.succeeded = self.failed = 0
+                    log_rate_limit_state()
+                    proxy_pool.log_state()
+
+                if paused:
+                    await asyncio.sleep(max(min(pause, deadline - now, next_report - now), 0))
+                else:
+                    await self.wait_until(min(deadline, next_report))
+
+            if self.in_flight:
+                await asyncio.gather(*self.in_flight, return_exceptions=True)
+
+        finally:
+            for task in self.in_flight:
+                task.cancel()
@@ -1,8 +1,10 @@
-from colorama import Style
+import asyncio
+import time
+
 from datetime import timedelta
 
-from utils.settings import DOMAIN_API, logger, Fore
-from utils.services import retry_request, mark_token, mask_token
+from utils.settings import DOMAIN_API, CLAIM_RECHECK_INTERVAL, logger, Fore, Style
+from utils.services import retry_request, mark_token, mask_token, record_earnings, timed
 
 # Function to display account information
 def display_account_info(account, data):
@@ -31,7 +33,21 @@ def get_reward_mapping():
         "18": {"name": "28天", "required": "21天", "is_progress_based": False}
     }
 
+# Seconds until the earliest tracked reward should become claimable, or None if unknown
+def next_claim_delay(data, reward_mapping):
+    delays = []
+    for item in data:
+        if str(item.get('id')) not in reward_mapping:
+            continue
+
+        remain_time = int(item.get('remain_time') or 0) / 1000
+        if remain_time > 0:
+            delays.append(remain_time)
+
+    return min(delays) if delays else None
+
 # Fetch and display profile information for the account
+@timed
 async def get_profile_info(account):
     try:
         # Check if the token is already processed
@@ -51,16 +67,17 @@ async def get_profile_info(account):
 
         if response.get("success"):
             logger.info(f"{Fore.CYAN}{account.index:02d}{Fore.RESET} - 账户资料获取{Fore.GREEN}成功{Fore.RESET}")
-            account.account_info = response["data"]
-            data = account.account_info
+            data = response["data"]
+            account.uid = data.get("uid")
+            account.synced_at = time.time()
 
             # Display account info
             logger.info(separator_line)
             display_account_info(account, data)
 
-            if account.account_info.get("uid"):
-                await get_earning_info(account)
-                await process_and_claim_rewards(account)
+            # Earnings and missions only need the uid, so both are fetched at once
+            if account.uid:
+                await asyncio.gather(get_earning_info(account), process_and_claim_rewards(account))
 
             logger.info(separator_line)
 
@@ -90,6 +107,7 @@ async def get_earning_info(account):
             return
 
         # Display earning information using the new function
+        record_earnings(account, data)
         display_earning_info(account, data)
 
     except Exception as e:
@@ -114,17 +132,40 @@ async def process_and_claim_rewards(account):
 
         # Get the reward mapping from the new function
         reward_mapping = get_reward_mapping()
+        await claim_rewards(account, data, reward_mapping)
 
-        for item in data:
-            reward_info = reward_mapping.get(str(item['id']))
-            if reward_info:
-                if reward_info["required"] and reward_info["required"] not in account.claimed_rewards:
-                    continue
-                await claim_reward(account, item, reward_info["name"], reward_info["required"], reward_info["is_progress_based"])
+        # Come back when the next reward unlocks, with a small margin so it is AVAILABLE by then
+        delay = next_claim_delay(data, reward_mapping)
+        account.next_claim_time = time.time() + (min(delay + 5, CLAIM_RECHECK_INTERVAL) if delay is not None else CLAIM_RECHECK_INTERVAL)
 
     except Exception as e:
         logger.info(f"{Fore.CYAN}{account.index:02d}{Fore.RESET} - {Fore.RED}检查奖励时发生错误:{Fore.RESET} {e}")
 
+# Claim the tracked rewards of one sweep concurrently; a reward with a required one waits for it and is skipped unless it was claimed
+async def claim_rewards(account, data, reward_mapping):
+    claims = {}
+    tasks = []
+
+    async def claim_after(item, reward_info):
+        required = reward_info["required"]
+        if required in claims:
+            await asyncio.wait([claims[required]])
+        if required and not account.has_claimed(required):
+            return
+        await claim_reward(account, item, reward_info["name"], required, reward_info["is_progress_based"])
+
+    # Every task is registered before any of them runs, so a chained reward finds its requirement whatever the mission order
+    for item in data:
+        reward_info = reward_mapping.get(str(item['id']))
+        if reward_info:
+            task = asyncio.create_task(claim_after(item, reward_info))
+            claims[reward_info["name"]] = task
+            tasks.append(task)
+
+    for result in await asyncio.gather(*tasks, return_exceptions=True):
+        if isinstance(result, Exception):
+            logger.info(f"{Fore.CYAN}{account.index:02d}{Fore.RESET} - {Fore.RED}检查奖励时发生错误:{Fore.RESET} {result}")
+
 # Handle the process of claiming daily rewards for an account
 async def claim_reward(account, reward_data, reward_name, required_claim=None, is_progress_based=False):
     current_process = reward_data.get('current_process', 0)
@@ -139,7 +180,7 @@ async def claim_reward(account, reward_data, reward_name, required_claim=None, i
     if reward_data.get('status') == "AVAILABLE":
         logger.info(f"{Fore.CYAN}{account.index:02d}{Fore.RESET} - {Fore.GREEN}{reward_name} 奖励可领取{Fore.RESET}")
         await complete_reward_claim(account, reward_data['id'], reward_name)
-        account.claimed_rewards.add(reward_name.replace(" ", "-"))
+        account.mark_claimed(reward_name.replace(" ", "-"))
 
     # Reward locked, handle locked and progress-based cases
     elif reward_data.get('status') == "LOCK":
@@ -164,7 +205,7 @@ async def claim_reward(account, reward_data, reward_name, required_claim=None, i
     # Handle rewards that are already completed
     elif reward_data.get('status') == "COMPLETED":
         logger.info(f"{Fore.CYAN}{account.index:02d}{Fore.RESET} - {Fore.GREEN}{reward_name} 奖励已完成并领取{Fore.RESET}")
-        account.claimed_rewards.add(reward_name.replace(" ", "-"))
+        account.mark_claimed(reward_name.replace(" ", "-"))
 
     else:
         logger.warning(f"{Fore.CYAN}{account.index:02d}{Fore.RESET} - {Fore.RED}未处理状态 '{reward_data.get('status')}' 对于 {reward_name}.{Fore.RESET}")
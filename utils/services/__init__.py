@@ -1,3 +1,13 @@
 from .api_client import send_request, retry_request
-from .token_manager import processed_tokens, mark_token, mask_token, load_tokens
-from .proxy_manager import get_proxy_choice, assign_proxies, resolve_ip
\ No newline at end of file
+from .token_manager import processed_tokens, mark_token, mask_token, iter_tokens, log_token_stats
+from .proxy_manager import get_proxy_choice, load_proxies, assign_proxies, resolve_ip, close_ip_session
+from .session_pool import acquire_session, close_sessions
+from .rate_limiter import rate_limit_snapshot, log_rate_limit_state
+from .state_store import open_state_store, restore_accounts, is_fresh
+from .proxy_health import proxy_pool
+from .proxy_checker import prevalidate_proxies
+from .retry_policy import FatalRequestError, breaker_remaining, retry_budget
+from .metrics import record_ping, record_earnings, start_metrics_server, stop_metrics_server
+from .metrics import mark_fleet_start, expect_first_ping, mark_fleet_loaded, record_first_ping, discard_first_ping, timed
+from .profiler import start_instrumentation, stop_instrumentation
+from .fast_mode import log_runtime
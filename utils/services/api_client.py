@@ -1,129 +1,163 @@
 import asyncio
 import json
 import random
-import requests
 import time
 
 from curl_cffi import requests
+from types import MappingProxyType
 from urllib.parse import urlparse
-from utils.settings import DOMAIN_API, REQUEST_TIMEOUT, logger, Fore
-
+from utils.services.fast_mode import dumps, loads
+from utils.services.metrics import start_request, record_request, record_retry, timed
+from utils.services.proxy_health import proxy_pool
+from utils.services.retry_policy import FatalRequestError, is_retryable_status, is_host_failure, get_breaker, retry_budget
+from utils.services.rate_limiter import throttle, parse_retry_after, wait_for_cooldown
+from utils.services.session_pool import acquire_session
+from utils.settings import DOMAIN_API, DEBUG, config, logger, Fore
+
+
+# Headers sent with every request; Authorization is added per account
+BASE_HEADERS = {
+    "Content-Type": "application/json",
+    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/130.0.0.0 Safari/537.36",
+}
+
+# Browser headers for the ping, activation, earn and mission endpoints
+BROWSER_HEADERS = {
+    # Necessary headers
+    "Accept": "application/json, text/plain, */*",
+    "Accept-Language": "en-US,en;q=0.9",
+    "Referer": "https://app.nodepay.ai/",
+    "Origin": "chrome-extension://lgmpfmgeabnnlemejacfljbmonaomfmm",
+    "Connection": "keep-alive",
 
-# Function to build HTTP headers dynamically with hardcoded User-Agent
-async def build_headers(url, account, method="POST", data=None):
+    # Optional headers
+    "Sec-CH-UA": '"Not/A)Brand";v="8", "Chromium";v="126", "Herond";v="126"',
+    "Sec-Ch-Ua-Mobile": "?0",
+    "Sec-Ch-Ua-Platform": '"Windows"',
+    "Sec-Fetch-Dest": "empty",
+    "Sec-Fetch-Mode": "cors",
+    "Sec-Fetch-Site": "cors-site",
+    "Pragma": "no-cache",
+    "Cache-Control": "no-cache",
+}
+
+# Default minimal headers
+MINIMAL_HEADERS = {"Accept": "application/json"}
+
+BROWSER_TEMPLATE = MappingProxyType({**BASE_HEADERS, **BROWSER_HEADERS})
+MINIMAL_TEMPLATE = MappingProxyType({**BASE_HEADERS, **MINIMAL_HEADERS})
+
+# Complete header templates per endpoint URL, computed once
+ENDPOINT_TEMPLATES = {
+    url: BROWSER_TEMPLATE
+    for url in (*DOMAIN_API["PING"], DOMAIN_API["ACTIVATE"], DOMAIN_API["EARN_INFO"], DOMAIN_API["MISSION"], DOMAIN_API["COMPLETE_MISSION"])
+}
+
+
+# Function to return the read-only header template for an endpoint
+def get_endpoint_headers(url):
     """
-    Build headers for API requests dynamically with fixed User-Agent.
+    Return the precomputed header template for the API endpoint.
     """
-    # Start with base headers
-    headers = {
-        "Authorization": f"Bearer {account.token}",
-        "Content-Type": "application/json",
-        "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/130.0.0.0 Safari/537.36",
-    }
-
-    # Add endpoint-specific headers
-    endpoint_specific_headers = get_endpoint_headers(url)
-    headers.update(endpoint_specific_headers)
-
-    # Validate serializability of data
-    if method in ["POST", "PUT"] and data is not None:
-        if not isinstance(data, dict):
-            raise ValueError("Payload must be a dictionary.")
-        try:
-            json.dumps(data, ensure_ascii=False)
-        except (TypeError, ValueError) as e:
-            raise ValueError(f"Invalid payload data: {e}")
+    return ENDPOINT_TEMPLATES.get(url, MINIMAL_TEMPLATE)
 
+# Function to build HTTP headers from the endpoint template and the account's Authorization value
+def build_headers(url, account):
+    """
+    Build headers for API requests from precomputed templates.
+    """
+    headers = dict(get_endpoint_headers(url))
+    headers["Authorization"] = account.authorization
     return headers
 
-# Function to return endpoint-specific headers based on the API
-def get_endpoint_headers(url):
+# Function to serialize a request payload once, producing the exact bytes sent on the wire
+def encode_payload(method, data):
     """
-    Return endpoint-specific headers based on the API.
+    Serialize the payload for body-carrying methods.
     """
-    EARN_MISSION_SET = {DOMAIN_API["EARN_INFO"], DOMAIN_API["MISSION"], DOMAIN_API["COMPLETE_MISSION"]}
-    PING_LIST = DOMAIN_API["PING"]
-    ACTIVATE_URL = DOMAIN_API["ACTIVATE"]
-
-    # Necessary headers
-    necessary_headers = {
-        "Accept": "application/json, text/plain, */*",
-        "Accept-Language": "en-US,en;q=0.9",
-        "Referer": "https://app.nodepay.ai/",
-        "Origin": "chrome-extension://lgmpfmgeabnnlemejacfljbmonaomfmm",
-        "Connection": "keep-alive",
-    }
-
-    # Optional headers
-    optional_headers = {
-        "Sec-CH-UA": '"Not/A)Brand";v="8", "Chromium";v="126", "Herond";v="126"',
-        "Sec-Ch-Ua-Mobile": "?0",
-        "Sec-Ch-Ua-Platform": '"Windows"',
-        "Sec-Fetch-Dest": "empty",
-        "Sec-Fetch-Mode": "cors",
-        "Sec-Fetch-Site": "cors-site",
-        "Pragma": "no-cache",
-        "Cache-Control": "no-cache",
-    }
-
-    # Check if the URL matches specific sets
-    if url in PING_LIST or url in EARN_MISSION_SET or url == ACTIVATE_URL:
-        return {**necessary_headers, **optional_headers}
-
-    # Default minimal headers
-    return {"Accept": "application/json"}
+    if method not in ("POST", "PUT") or data is None:
+        return None
+    if not isinstance(data, dict):
+        raise ValueError("Payload must be a dictionary.")
+    try:
+        return dumps(data)
+    except (TypeError, ValueError) as e:
+        raise ValueError(f"Invalid payload data: {e}")
 
 # Function to send HTTP requests with error handling and custom headers
-async def send_request(url, data, account, method="POST", timeout=REQUEST_TIMEOUT):
+@timed
+async def send_request(url, data, account, method="POST", timeout=None):
     """
     Perform HTTP requests with proper headers and error handling.
     """
+    timeout = timeout or config.REQUEST_TIMEOUT
     if not url or not isinstance(url, str):
         raise ValueError("URL must be a valid string.")
     if data and not isinstance(data, dict):
         raise ValueError("Data must be a dictionary.")
 
-    headers = await build_headers(url, account, method, data)
-    if not headers:
-        logger.error(f"{Fore.CYAN}{account.index:02d}{Fore.RESET} - {Fore.RED}No headers generated for URL: {urlparse(url).path}{Fore.RESET}")
-        raise ValueError("Failed to generate headers")
+    headers = build_headers(url, account)
+    body = encode_payload(method, data)
 
-    proxies = {"http": account.proxy, "https": account.proxy} if account.proxy else None
+    proxy = account.proxy
     response = None
 
+    started = start_request()
     try:
-        # Select HTTP method
-        if method == "GET":
-            response = requests.get(url, headers=headers, proxies=proxies, impersonate="safari15_5", timeout=timeout)
-        else:
-            response = requests.post(url, json=data, headers=headers, proxies=proxies, impersonate="safari15_5", timeout=timeout)
+        # Select HTTP method on the pooled keep-alive session for this account's proxy
+        try:
+            async with acquire_session(proxy) as session:
+                if method == "GET":
+                    response = await session.get(url, headers=headers, timeout=timeout)
+                else:
+                    response = await session.post(url, data=body, headers=headers, timeout=timeout)
+        finally:
+            record_request(url, started, response.status_code if response is not None else "error")
+
+        # Any HTTP answer other than a 403 ban proves the proxy itself works
+        if proxy and response.status_code != 403:
+            proxy_pool.record_success(proxy, time.monotonic() - started)
+        if response.status_code not in (403, 429):
+            get_breaker(url).record(is_host_failure(response.status_code))
 
         response.raise_for_status()  # Raise exception for HTTP errors
 
         try:
-            return response.json()  # Parse JSON response
+            return loads(response.content)  # Parse JSON response
         except json.JSONDecodeError:
             logger.error(f"{Fore.CYAN}{account.index:02d}{Fore.RESET} - {Fore.RED}Failed to decode JSON response: "
                          f"{getattr(response, 'text', 'No response')}{Fore.RESET}")
             raise ValueError("Invalid JSON in response")
 
-    except requests.exceptions.ProxyError:
+    except requests.exceptions.ProxyError as e:
         logger.error(f"{Fore.CYAN}{account.index:02d}{Fore.RESET} - {Fore.RED}Proxy connection failed. Unable to connect to proxy{Fore.RESET}")
+        if proxy:
+            proxy_pool.record_failure(proxy, str(e).split(". See")[0])
         raise
 
     except requests.exceptions.RequestException as e:
         error_message = str(e)
         logger.error(f"{Fore.CYAN}{account.index:02d}{Fore.RESET} - {Fore.RED}Request error: {urlparse(url).path}{Fore.RESET}")
 
+        # Connection-level failures and 403 bans count against the proxy
+        if proxy and (response is None or response.status_code == 403):
+            proxy_pool.record_failure(proxy, "403 Forbidden" if response is not None else error_message.split(". See")[0])
+        # Without a proxy a connection failure points at the host; through one it is already charged to the proxy
+        if response is None and proxy is None:
+            get_breaker(url).record(True)
+
         # Handle specific HTTP errors
         if response:
             if response.status_code == 403:
                 logger.error(f"{Fore.CYAN}{account.index:02d}{Fore.RESET} - {Fore.RED}403 Forbidden: Check permissions or proxy{Fore.RESET}")
-                time.sleep(random.uniform(5, 10))
+                throttle(url, account.proxy, random.uniform(5, 10), "403 Forbidden")
             elif response.status_code == 429:
-                retry_after = response.headers.get("Retry-After", "5")
-                logger.warning(f"{Fore.CYAN}{account.index:02d}{Fore.RESET} - {Fore.YELLOW}Rate limited (429). Retrying after {retry_after} seconds{Fore.RESET}")
-                time.sleep(int(retry_after))
+                retry_after = parse_retry_after(response.headers.get("Retry-After"))
+                logger.warning(f"{Fore.CYAN}{account.index:02d}{Fore.RESET} - {Fore.YELLOW}Rate limited (429). Retrying after {retry_after:.0f} seconds{Fore.RESET}")
+                throttle(url, account.proxy, retry_after, "429 Too Many Requests")
+            elif not is_retryable_status(response.status_code):
+                logger.error(f"{Fore.CYAN}{account.index:02d}{Fore.RESET} - {Fore.RED}{response.status_code} response is not retryable: check the token{Fore.RESET}")
+                raise FatalRequestError(f"HTTP {response.status_code} for {urlparse(url).path}", response.status_code)
         elif "timed out" in error_message:
             logger.error(f"{Fore.CYAN}{account.index:02d}{Fore.RESET} - {Fore.RED}Connection timed out after {timeout} seconds{Fore.RESET}")
 
@@ -136,17 +170,39 @@ async def send_request(url, data, account, method="POST", timeout=REQUEST_TIMEOU
 # Function to send HTTP requests with retry logic using exponential backoff
 async def retry_request(url, data, account, method="POST", max_retries=3):
     """
-    Retry requests using exponential backoff.
+    Retry retryable failures using exponential backoff, within the global retry budget and the host's circuit breaker.
     """
+    breaker = get_breaker(url)
+    retry_budget.record_attempt()
+
     for retry_count in range(max_retries):
+        # Switch to a healthy spare if this account's proxy is quarantined
+        proxy_pool.failover(account)
+
+        if not breaker.allow():
+            if DEBUG:
+                logger.debug(f"{Fore.CYAN}{account.index:02d}{Fore.RESET} - Circuit open for {breaker.host}, skipping {urlparse(url).path}")
+            return None
+
         try:
+            await wait_for_cooldown(url, account)
             response = await send_request(url, data, account, method)
             if response:
                 return response  # Return the response if successful
+        except FatalRequestError as e:
+            logger.error(f"{Fore.CYAN}{account.index:02d}{Fore.RESET} - {Fore.RED}Not retrying: {e}{Fore.RESET}")
+            return None
         except Exception as e:
             short_error = str(e).split(". See")[0]
             logger.error(f"{Fore.CYAN}{account.index:02d}{Fore.RESET} - {Fore.RED}Error: {short_error}{Fore.RESET}")
 
+        if retry_count + 1 >= max_retries:
+            break
+        if not retry_budget.try_spend():
+            logger.warning(f"{Fore.CYAN}{account.index:02d}{Fore.RESET} - {Fore.YELLOW}Retry budget exhausted, not retrying {urlparse(url).path}{Fore.RESET}")
+            return None
+
+        record_retry(url)
         delay = await exponential_backoff(retry_count)
         logger.info(f"{Fore.CYAN}{account.index:02d}{Fore.RESET} - Retry {retry_count + 1}/{max_retries}: Waiting {delay:.2f} seconds...")
 
@@ -0,0 +1,47 @@
+import asyncio
+import json
+
+from utils.settings import FAST_MODE, logger, Fore
+
+# FAST_MODE uses whichever of these optional packages is installed and falls back to the standard library otherwise;
+# neither is imported unless it is enabled
+orjson = uvloop = None
+if FAST_MODE:
+    try:
+        import orjson
+    except ImportError:
+        pass
+
+    try:
+        import uvloop
+    except ImportError:
+        pass
+
+
+use_orjson = orjson is not None
+use_uvloop = uvloop is not None
+
+
+# Serialize a payload to the compact JSON bytes sent on the wire
+def dumps(data):
+    return json.dumps(data, separators=(",", ":")).encode()
+
+# Parse a JSON response body; orjson.JSONDecodeError subclasses json.JSONDecodeError, so callers catch either the same way
+loads = json.loads
+
+if use_orjson:
+    dumps = orjson.dumps
+    loads = orjson.loads
+
+# Run a coroutine to completion, on uvloop in fast mode
+def run(main):
+    if use_uvloop:
+        asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+    return asyncio.run(main)
+
+# Log which fast-mode components are in use
+def log_runtime():
+    if FAST_MODE:
+        components = {"uvloop": use_uvloop, "orjson": use_orjson}
+        logger.info(f"{Fore.CYAN}00{Fore.RESET} - Fast mode: " + ", ".join(
+            f"{name} {'enabled' if enabled else 'not installed, using the standard library'}" for name, enabled in components.items()))
@@ -0,0 +1,259 @@
+import asyncio
+import functools
+import time
+
+from bisect import bisect_left
+from urllib.parse import urlparse
+
+from utils.services.proxy_health import proxy_pool
+from utils.services.proxy_manager import proxy_label
+from utils.services.retry_policy import breakers, retry_budget
+from utils.settings import METRICS_HOST, LOOP_LAG_WARN, logger, Fore
+
+
+# Request latency histogram buckets in seconds
+LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+# Seconds between event-loop lag samples
+LAG_INTERVAL = 1
+# Earnings fields exported from the earn info endpoint
+EARNING_FIELDS = ("total_earning", "today_earning", "current_point", "pending_point")
+
+
+# Counters keyed by label tuples; plain dicts keep updates to a hash lookup and an add
+ping_results = {}
+proxy_ping_results = {}
+request_latency = {}
+request_statuses = {}
+retries = {}
+earnings = {}
+# Fleet-wide totals, kept alongside the labelled counters so summaries never iterate accounts
+ping_totals = {"success": 0, "failure": 0}
+earning_totals = {field: 0.0 for field in EARNING_FIELDS}
+in_flight = 0
+loop_lag = 0.0
+loop_lag_max = 0.0
+# Calls, total seconds and slowest call of each @timed coroutine function
+function_timings = {}
+
+# Time to first ping: accounts of the starting fleet that have not pinged yet, and seconds from fleet start for those that have;
+# the fleet summary is logged once every account has been loaded and has pinged
+fleet_started = None
+fleet_loaded = False
+first_ping_pending = set()
+first_ping_times = []
+
+metrics_runner = None
+
+
+# Count a ping outcome for the account and its proxy
+def record_ping(account, ok):
+    result = "success" if ok else "failure"
+    ping_totals[result] += 1
+    key = (f"{account.index:02d}", result)
+    ping_results[key] = ping_results.get(key, 0) + 1
+    key = (proxy_label(account.proxy), result)
+    proxy_ping_results[key] = proxy_ping_results.get(key, 0) + 1
+
+# Mark a request as started, returning the start time to pass to record_request
+def start_request():
+    global in_flight
+    in_flight += 1
+    return time.monotonic()
+
+# Observe a finished request's latency and status ("error" when no response came back)
+def record_request(url, started, status):
+    global in_flight
+    in_flight -= 1
+
+    path = urlparse(url).path
+    histogram = request_latency.get(path)
+    if histogram is None:
+        histogram = request_latency[path] = [[0] * (len(LATENCY_BUCKETS) + 1), 0.0]
+    elapsed = time.monotonic() - started
+    histogram[0][bisect_left(LATENCY_BUCKETS, elapsed)] += 1
+    histogram[1] += elapsed
+
+    key = (path, str(status))
+    request_statuses[key] = request_statuses.get(key, 0) + 1
+
+def record_retry(url):
+    path = urlparse(url).path
+    retries[path] = retries.get(path, 0) + 1
+
+# Keep the latest earnings reported for an account
+def record_earnings(account, data):
+    values = {}
+    for field in EARNING_FIELDS:
+        try:
+            values[field] = float(data.get(field) or 0)
+        except (TypeError, ValueError):
+            continue
+    previous = earnings.get(f"{account.index:02d}", {})
+    for field, value in values.items():
+        earning_totals[field] += value - previous.get(field, 0.0)
+    earnings[f"{account.index:02d}"] = values
+
+# Start the time-to-first-ping clock for a starting fleet
+def mark_fleet_start():
+    global fleet_started
+    fleet_started = time.monotonic()
+
+# Wait for a first ping from an account of the starting fleet as it is loaded
+def expect_first_ping(account):
+    first_ping_pending.add(account)
+
+# Every account of the starting fleet has been loaded
+def mark_fleet_loaded():
+    global fleet_loaded
+    fleet_loaded = True
+    report_first_pings()
+
+# Record an account's first ping attempt
+def record_first_ping(account):
+    if account not in first_ping_pending:
+        return
+    first_ping_pending.discard(account)
+    first_ping_times.append(time.monotonic() - fleet_started)
+    report_first_pings()
+
+# Stop waiting for a first ping from an account that was retired
+def discard_first_ping(account):
+    first_ping_pending.discard(account)
+    report_first_pings()
+
+# Log the fleet's time to first ping once, when the whole fleet is loaded and no account is still waiting
+def report_first_pings():
+    global fleet_loaded
+    if not fleet_loaded or first_ping_pending or not first_ping_times:
+        return
+    fleet_loaded = False
+    (_, p50), (_, p95), (_, slowest) = first_ping_quantiles()
+    logger.info(f"{Fore.CYAN}00{Fore.RESET} - {Fore.GREEN}All {len(first_ping_times)} accounts pinged within {slowest:.1f}s of startup "
+                f"(p50 {p50:.1f}s, p95 {p95:.1f}s){Fore.RESET}")
+
+# Time every call of a coroutine function, awaits included, into function_timings under its name
+def timed(function):
+    timings = function_timings[function.__name__] = [0, 0.0, 0.0]
+
+    @functools.wraps(function)
+    async def wrapper(*args, **kwargs):
+        started = time.perf_counter()
+        try:
+            return await function(*args, **kwargs)
+        finally:
+            elapsed = time.perf_counter() - started
+            timings[0] += 1
+            timings[1] += elapsed
+            if elapsed > timings[2]:
+                timings[2] = elapsed
+
+    return wrapper
+
+# Measure how late the event loop wakes up from a fixed sleep, warning when something blocked it past LOOP_LAG_WARN
+async def monitor_loop_lag():
+    global loop_lag, loop_lag_max
+    loop = asyncio.get_running_loop()
+    while True:
+        expected = loop.time() + LAG_INTERVAL
+        await asyncio.sleep(LAG_INTERVAL)
+        loop_lag = max(loop.time() - expected, 0.0)
+        loop_lag_max = max(loop_lag_max, loop_lag)
+        if LOOP_LAG_WARN and loop_lag > LOOP_LAG_WARN:
+            logger.warning(f"{Fore.CYAN}00{Fore.RESET} - {Fore.YELLOW}Event loop was blocked for {loop_lag:.3f}s{Fore.RESET}")
+
+# p50, p95 and slowest time to first ping so far
+def first_ping_quantiles():
+    if not first_ping_times:
+        return []
+    ordered = sorted(first_ping_times)
+    return [(quantile, ordered[min(int(len(ordered) * quantile), len(ordered) - 1)]) for quantile in (0.5, 0.95, 1)]
+
+def format_labels(**labels):
+    return "{" + ",".join(f'{name}="{value}"' for name, value in labels.items()) + "}"
+
+# Render every metric in the Prometheus text exposition format
+def render_metrics():
+    lines = [
+        "# TYPE nodepay_ping_total counter",
+        *(f"nodepay_ping_total{format_labels(account=account, result=result)} {count}" for (account, result), count in ping_results.items()),
+        "# TYPE nodepay_proxy_ping_total counter",
+        *(f"nodepay_proxy_ping_total{format_labels(proxy=proxy, result=result)} {count}" for (proxy, result), count in proxy_ping_results.items()),
+        "# TYPE nodepay_requests_total counter",
+        *(f"nodepay_requests_total{format_labels(endpoint=path, status=status)} {count}" for (path, status), count in request_statuses.items()),
+        "# TYPE nodepay_request_duration_seconds histogram",
+    ]
+
+    for path, (buckets, total) in request_latency.items():
+        cumulative = 0
+        for bound, count in zip((*LATENCY_BUCKETS, "+Inf"), buckets):
+            cumulative += count
+            lines.append(f"nodepay_request_duration_seconds_bucket{format_labels(endpoint=path, le=bound)} {cumulative}")
+        lines.append(f"nodepay_request_duration_seconds_sum{format_labels(endpoint=path)} {total:.6f}")
+        lines.append(f"nodepay_request_duration_seconds_count{format_labels(endpoint=path)} {cumulative}")
+
+    lines += [
+        "# TYPE nodepay_retries_total counter",
+        *(f"nodepay_retries_total{format_labels(endpoint=path)} {count}" for path, count in retries.items()),
+        "# TYPE nodepay_retry_budget_exhausted_total counter",
+        f"nodepay_retry_budget_exhausted_total {retry_budget.exhausted}",
+        "# TYPE nodepay_circuit_open gauge",
+        *(f"nodepay_circuit_open{format_labels(host=host)} {int(breaker.state != 'closed')}" for host, breaker in breakers.items()),
+        "# TYPE nodepay_requests_in_flight gauge",
+        f"nodepay_requests_in_flight {in_flight}",
+        "# TYPE nodepay_event_loop_lag_seconds gauge",
+        f"nodepay_event_loop_lag_seconds {loop_lag:.6f}",
+        "# TYPE nodepay_event_loop_lag_max_seconds gauge",
+        f"nodepay_event_loop_lag_max_seconds {loop_lag_max:.6f}",
+        "# TYPE nodepay_function_seconds summary",
+        *(line for name, (calls, total, _) in function_timings.items() for line in (
+            f"nodepay_function_seconds_sum{format_labels(function=name)} {total:.6f}",
+            f"nodepay_function_seconds_count{format_labels(function=name)} {calls}",
+        )),
+        "# TYPE nodepay_function_max_seconds gauge",
+        *(f"nodepay_function_max_seconds{format_labels(function=name)} {slowest:.6f}" for name, (_, _, slowest) in function_timings.items()),
+        "# TYPE nodepay_first_ping_pending gauge",
+        f"nodepay_first_ping_pending {len(first_ping_pending)}",
+        "# TYPE nodepay_first_ping_seconds summary",
+        *(f"nodepay_first_ping_seconds{format_labels(quantile=quantile)} {value:.3f}" for quantile, value in first_ping_quantiles()),
+        "# TYPE nodepay_proxies_quarantined gauge",
+        f"nodepay_proxies_quarantined {sum(proxy_pool.is_quarantined(proxy) for proxy in proxy_pool.health)}",
+    ]
+
+    for field in EARNING_FIELDS:
+        lines.append(f"# TYPE nodepay_{field} gauge")
+        lines.extend(f"nodepay_{field}{format_labels(account=account)} {values[field]}" for account, values in earnings.items() if field in values)
+
+    return "\n".join(lines) + "\n"
+
+async def handle_metrics(request):
+    from aiohttp import web
+    return web.Response(text=render_metrics(), content_type="text/plain", charset="utf-8")
+
+# Serve /metrics on the local port; aiohttp is only imported when the endpoint is enabled
+async def start_metrics_server(port):
+    global metrics_runner
+    if not port or metrics_runner is not None:
+        return
+
+    from aiohttp import web
+
+    app = web.Application()
+    app.router.add_get("/metrics", handle_metrics)
+    runner = web.AppRunner(app, access_log=None)
+    await runner.setup()
+    try:
+        await web.TCPSite(runner, METRICS_HOST, port).start()
+    except OSError as e:
+        logger.error(f"{Fore.CYAN}00{Fore.RESET} - {Fore.RED}Metrics server could not listen on {METRICS_HOST}:{port}: {e}{Fore.RESET}")
+        await runner.cleanup()
+        return
+
+    metrics_runner = runner
+    logger.info(f"{Fore.CYAN}00{Fore.RESET} - Metrics available at http://{METRICS_HOST}:{port}/metrics")
+
+# Stop the metrics server, used during shutdown
+async def stop_metrics_server():
+    global metrics_runner
+    if metrics_runner is not None:
+        await metrics_runner.cleanup()
+        metrics_runner = None
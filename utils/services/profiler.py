@@ -0,0 +1,99 @@
+import asyncio
+import io
+import logging
+import os
+import signal
+import time
+
+from utils.services.metrics import monitor_loop_lag
+from utils.settings import SLOW_CALLBACK, PROFILE_SECONDS, PROFILE_DIR, logger, Fore
+
+
+# Functions listed in the text report of a profile dump
+REPORT_ROWS = 60
+
+profile = None
+instrumentation_tasks = set()
+
+
+# Re-route asyncio's slow-callback warnings, which name the task and coroutine that blocked the loop, to the bot's log;
+# every other asyncio record, such as unretrieved task exceptions, goes to its usual handlers
+class SlowCallbackFilter(logging.Filter):
+    def filter(self, record):
+        message = record.getMessage()
+        if message.startswith("Executing ") and " took " in message:
+            logger.warning(f"{Fore.CYAN}00{Fore.RESET} - {Fore.YELLOW}Slow callback: {message}{Fore.RESET}")
+            return False
+        return True
+
+# Start collecting a cProfile of the whole process
+def start_profile():
+    global profile
+    if profile is not None:
+        return
+    import cProfile
+    profile = cProfile.Profile()
+    profile.enable()
+    logger.info(f"{Fore.CYAN}00{Fore.RESET} - Profiler started")
+
+# Stop the running profile and write it to PROFILE_DIR as a .prof file plus a text report sorted by cumulative time
+def dump_profile():
+    global profile
+    if profile is None:
+        return None
+    profile.disable()
+    finished, profile = profile, None
+
+    os.makedirs(PROFILE_DIR, exist_ok=True)
+    path = os.path.join(PROFILE_DIR, f"profile-{os.getpid()}-{time.strftime('%Y%m%d-%H%M%S')}")
+    finished.dump_stats(f"{path}.prof")
+
+    import pstats
+    report = io.StringIO()
+    pstats.Stats(finished, stream=report).sort_stats("cumulative").print_stats(REPORT_ROWS)
+    with open(f"{path}.txt", "w") as file:
+        file.write(report.getvalue())
+
+    logger.info(f"{Fore.CYAN}00{Fore.RESET} - Profile written to {path}.prof and {path}.txt")
+    return path
+
+# SIGUSR2 starts a profile, the next SIGUSR2 writes it out
+def toggle_profile():
+    if profile is None:
+        start_profile()
+    else:
+        dump_profile()
+
+# Profile the first PROFILE_SECONDS after startup
+async def profile_startup(seconds):
+    start_profile()
+    await asyncio.sleep(seconds)
+    dump_profile()
+
+# Turn on lag sampling, slow-callback reports and the profiler triggers for the running event loop
+def start_instrumentation():
+    loop = asyncio.get_running_loop()
+
+    for coroutine in (monitor_loop_lag(), *((profile_startup(PROFILE_SECONDS),) if PROFILE_SECONDS else ())):
+        task = asyncio.create_task(coroutine)
+        instrumentation_tasks.add(task)
+        task.add_done_callback(instrumentation_tasks.discard)
+
+    # asyncio's debug mode times every callback and names the ones slower than slow_callback_duration
+    if SLOW_CALLBACK:
+        loop.set_debug(True)
+        loop.slow_callback_duration = SLOW_CALLBACK
+        asyncio_logger = logging.getLogger("asyncio")
+        asyncio_logger.setLevel(logging.WARNING)
+        asyncio_logger.addFilter(SlowCallbackFilter())
+
+    try:
+        loop.add_signal_handler(signal.SIGUSR2, toggle_profile)
+    except (AttributeError, NotImplementedError, RuntimeError):
+        pass
+
+# Stop instrumentation during shutdown, writing out a profile that is still running
+def stop_instrumentation():
+    for task in instrumentation_tasks:
+        task.cancel()
+    dump_profile()
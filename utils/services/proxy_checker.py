@@ -0,0 +1,114 @@
+import asyncio
+import json
+import os
+import time
+
+from utils.services.proxy_manager import get_ip_address, is_resolved_ip, cache_ip, close_ip_session, get_proxy_ip
+from utils.settings import PROXY_CHECK_CONCURRENCY, PROXY_CHECK_TIMEOUT, PROXY_CHECK_CACHE, PROXY_CHECK_TTL, PROXY_CHECK_DROP
+from utils.settings import logger, Fore
+
+
+# Load cached check results, ignoring a missing or corrupt file
+def load_check_cache(path=PROXY_CHECK_CACHE):
+    if not path or not os.path.exists(path):
+        return {}
+    try:
+        with open(path, 'r') as file:
+            cache = json.load(file)
+        return cache if isinstance(cache, dict) else {}
+    except (OSError, ValueError) as e:
+        logger.warning(f"{Fore.CYAN}00{Fore.RESET} - {Fore.YELLOW}Ignoring unreadable proxy check cache {path}: {e}{Fore.RESET}")
+        return {}
+
+# Write check results atomically so an interrupted write never corrupts the cache
+def save_check_cache(cache, path=PROXY_CHECK_CACHE):
+    if not path:
+        return
+    try:
+        temp_path = f"{path}.tmp"
+        with open(temp_path, 'w') as file:
+            json.dump(cache, file)
+        os.replace(temp_path, path)
+    except OSError as e:
+        logger.warning(f"{Fore.CYAN}00{Fore.RESET} - {Fore.YELLOW}Failed to save proxy check cache {path}: {e}{Fore.RESET}")
+
+# Check one proxy's reachability, latency and exit IP
+async def check_proxy(proxy, timeout=PROXY_CHECK_TIMEOUT):
+    started = time.monotonic()
+    try:
+        ip = await asyncio.wait_for(get_ip_address(proxy, timeout=timeout), timeout + 1)
+    except asyncio.TimeoutError:
+        ip = "Unknown"
+
+    ok = is_resolved_ip(ip, proxy)
+    return {"ok": ok, "ip": ip if ok else None, "latency": time.monotonic() - started if ok else None, "checked_at": time.time()}
+
+# Look the public IP up without a proxy, so a failed check is only blamed on the proxy when the endpoint itself answers
+async def check_endpoint(timeout=PROXY_CHECK_TIMEOUT):
+    try:
+        ip = await asyncio.wait_for(get_ip_address(timeout=timeout), timeout + 1)
+    except asyncio.TimeoutError:
+        return False
+    return is_resolved_ip(ip)
+
+# Test every proxy once with a bounded worker pool, reusing fresh cached results; never returns fewer proxies than
+# it was given unless some passed, so requested proxies are not silently replaced by direct connections
+async def prevalidate_proxies(proxies, concurrency=PROXY_CHECK_CONCURRENCY):
+    if not proxies:
+        return proxies
+
+    cache = load_check_cache()
+    now = time.time()
+    results = {proxy: cache[proxy] for proxy in proxies if now - cache.get(proxy, {}).get("checked_at", 0) < PROXY_CHECK_TTL}
+
+    # The IP lookup client only speaks HTTP proxies; others are kept unchecked
+    pending = asyncio.Queue()
+    for proxy in proxies:
+        if proxy not in results and proxy.startswith("http"):
+            pending.put_nowait(proxy)
+
+    checked = pending.qsize()
+
+    async def worker():
+        while True:
+            try:
+                proxy = pending.get_nowait()
+            except asyncio.QueueEmpty:
+                return
+            results[proxy] = await check_proxy(proxy)
+
+    try:
+        if checked and not await check_endpoint():
+            logger.warning(f"{Fore.CYAN}00{Fore.RESET} - {Fore.YELLOW}Proxy check endpoint is unreachable, "
+                           f"keeping all {len(proxies)} proxies unchecked{Fore.RESET}")
+            return proxies
+
+        if checked:
+            logger.info(f"{Fore.CYAN}00{Fore.RESET} - Checking {checked} proxies ({len(results)} cached)...")
+        await asyncio.gather(*(worker() for _ in range(min(concurrency, checked))))
+    finally:
+        await close_ip_session()
+
+    cache.update(results)
+    save_check_cache(cache)
+
+    # Seed the exit IP cache so the first pings do not look the same IPs up again
+    for proxy, result in results.items():
+        if result.get("ok") and result.get("ip"):
+            cache_ip(proxy, result["ip"])
+
+    healthy = sorted((proxy for proxy in proxies if results.get(proxy, {}).get("ok")), key=lambda proxy: results[proxy]["latency"])
+    unchecked = [proxy for proxy in proxies if proxy not in results]
+    failed = [proxy for proxy in proxies if proxy in results and not results[proxy].get("ok")]
+
+    logger.info(f"{Fore.CYAN}00{Fore.RESET} - Proxy check: {len(healthy)} working, {len(failed)} failed, {len(unchecked)} unchecked")
+    for proxy in failed[:10]:
+        logger.debug(f"{Fore.CYAN}00{Fore.RESET} - {Fore.YELLOW}Proxy {get_proxy_ip(proxy)} failed the startup check{Fore.RESET}")
+
+    # Fastest proxies are paired with tokens first; failed ones are moved to the end, or dropped when others remain
+    if PROXY_CHECK_DROP and (healthy or unchecked):
+        return healthy + unchecked
+    if PROXY_CHECK_DROP and failed:
+        logger.error(f"{Fore.CYAN}00{Fore.RESET} - {Fore.RED}No proxy passed the check, keeping all {len(failed)} "
+                     f"instead of connecting directly{Fore.RESET}")
+    return healthy + unchecked + failed
@@ -0,0 +1,144 @@
+import time
+
+from utils.services.proxy_manager import proxy_label
+from utils.settings import PROXY_FAILURE_THRESHOLD, PROXY_QUARANTINE, PROXY_MAX_QUARANTINE, PROXY_MAX_ACCOUNTS
+from utils.settings import logger, Fore
+
+
+# Weight of the newest latency sample in the moving average
+LATENCY_ALPHA = 0.2
+
+
+# Health counters for one proxy
+class ProxyHealth:
+    __slots__ = ('proxy', 'successes', 'failures', 'consecutive_failures', 'latency', 'last_error',
+                 'quarantined_until', 'quarantine_count')
+
+    def __init__(self, proxy):
+        self.proxy = proxy
+        self.successes = 0
+        self.failures = 0
+        self.consecutive_failures = 0
+        self.latency = None
+        self.last_error = None
+        self.quarantined_until = 0.0
+        self.quarantine_count = 0
+
+    @property
+    def success_rate(self):
+        total = self.successes + self.failures
+        return self.successes / total if total else 1.0
+
+    def is_quarantined(self, now=None):
+        return self.quarantined_until > (now or time.monotonic())
+
+
+# Tracks proxy outcomes, quarantines dead proxies and moves their accounts to healthy spares
+class ProxyPool:
+    def __init__(self):
+        self.health = {}
+        self.load = {}
+        self.token_proxies = {}
+
+    # Register the known proxies and the accounts already assigned to them
+    def configure(self, proxies, accounts=()):
+        for proxy in proxies:
+            self.health.setdefault(proxy, ProxyHealth(proxy))
+            self.load.setdefault(proxy, 0)
+        for account in accounts:
+            self.attach(account)
+
+    def attach(self, account):
+        if account.proxy:
+            self.health.setdefault(account.proxy, ProxyHealth(account.proxy))
+            self.load[account.proxy] = self.load.get(account.proxy, 0) + 1
+            self.token_proxies.setdefault(account.token, set()).add(account.proxy)
+
+    def detach(self, account):
+        if account.proxy:
+            self.load[account.proxy] = max(self.load.get(account.proxy, 1) - 1, 0)
+            proxies = self.token_proxies.get(account.token)
+            if proxies:
+                proxies.discard(account.proxy)
+                if not proxies:
+                    del self.token_proxies[account.token]
+
+    # Forget a proxy removed from proxies.txt so it is never picked as a spare again
+    def remove(self, proxy):
+        self.health.pop(proxy, None)
+        self.load.pop(proxy, None)
+
+    def record_success(self, proxy, latency):
+        health = self.health.get(proxy)
+        if health is None:
+            return
+        health.successes += 1
+        health.consecutive_failures = 0
+        health.quarantine_count = 0
+        health.latency = latency if health.latency is None else health.latency + LATENCY_ALPHA * (latency - health.latency)
+
+    # Count a failure and quarantine the proxy with an exponential cooldown once it keeps failing
+    def record_failure(self, proxy, error):
+        health = self.health.get(proxy)
+        if health is None:
+            return
+        health.failures += 1
+        health.consecutive_failures += 1
+        health.last_error = error
+
+        now = time.monotonic()
+        if health.consecutive_failures >= PROXY_FAILURE_THRESHOLD and not health.is_quarantined(now):
+            cooldown = min(PROXY_QUARANTINE * 2 ** health.quarantine_count, PROXY_MAX_QUARANTINE)
+            health.quarantined_until = now + cooldown
+            health.quarantine_count += 1
+            health.consecutive_failures = 0
+            logger.warning(f"{Fore.CYAN}00{Fore.RESET} - {Fore.YELLOW}Proxy {proxy_label(proxy)} quarantined for {cooldown} seconds "
+                           f"(success rate {health.success_rate:.0%}, last error: {error}){Fore.RESET}")
+
+    def is_quarantined(self, proxy):
+        health = self.health.get(proxy)
+        return health is not None and health.is_quarantined()
+
+    # Pick the healthiest spare proxy that this token is not already connected through
+    def find_spare(self, token):
+        now = time.monotonic()
+        used = self.token_proxies.get(token, ())
+        candidates = [
+            health for proxy, health in self.health.items()
+            if proxy not in used and not health.is_quarantined(now) and self.load.get(proxy, 0) < PROXY_MAX_ACCOUNTS
+        ]
+        if not candidates:
+            return None
+
+        best = min(candidates, key=lambda health: (self.load.get(health.proxy, 0), -health.success_rate, health.latency or 0))
+        return best.proxy
+
+    # Move an account off a quarantined proxy, keeping its token's connection count unchanged
+    def failover(self, account):
+        if not account.proxy or not self.is_quarantined(account.proxy):
+            return False
+
+        spare = self.find_spare(account.token)
+        if spare is None:
+            return False
+
+        old_proxy = account.proxy
+        self.detach(account)
+        account.proxy = spare
+        self.attach(account)
+        logger.info(f"{Fore.CYAN}{account.index:02d}{Fore.RESET} - {Fore.GREEN}Moved from proxy {proxy_label(old_proxy)} to {proxy_label(spare)}{Fore.RESET}")
+        return True
+
+    # Log a one-line summary of proxy health
+    def log_state(self):
+        if not self.health:
+            return
+
+        now = time.monotonic()
+        quarantined = [health for health in self.health.values() if health.is_quarantined(now)]
+        spares = sum(1 for proxy, health in self.health.items() if not health.is_quarantined(now) and self.load.get(proxy, 0) == 0)
+        logger.info(f"{Fore.CYAN}00{Fore.RESET} - Proxies: {len(self.health) - len(quarantined)} healthy, "
+                    f"{len(quarantined)} quarantined, {spares} spare")
+
+
+proxy_pool = ProxyPool()
@@ -1,54 +1,95 @@
-import aiohttp
+import asyncio
 import ssl
+import sys
+import time
 
 from urllib.parse import urlparse
-from utils.settings import logger, Fore
+from utils.settings import IP_CACHE_TTL, IP_REFRESH, PROXIES_FILE, USE_PROXY, HEADLESS, logger, Fore
 
 
-# Load proxies from a file
-def load_proxies():
+# Public IP lookups cached per proxy URL (None for direct connections)
+ip_cache = {}
+ip_lookups = {}
+ip_session = None
+
+# Seconds a failed lookup is remembered before trying again
+IP_FAILURE_TTL = 60
+
+
+# Proxy schemes supported by curl_cffi and aiohttp
+PROXY_SCHEMES = ("http", "https", "socks4", "socks5", "socks5h")
+
+
+# Check that a proxy line looks like protocol://[user:pass@]host:port
+def is_valid_proxy(proxy):
     try:
-        with open('proxies.txt', 'r') as file:
-            proxies = file.read().splitlines()
+        parsed = urlparse(proxy)
+        return parsed.scheme in PROXY_SCHEMES and bool(parsed.hostname) and parsed.port is not None
+    except ValueError:
+        return False
+
+# Load proxies from a file in a single pass, dropping duplicates and malformed lines
+def load_proxies(path=PROXIES_FILE):
+    try:
+        proxies, seen, skipped = [], set(), 0
+        with open(path, 'r') as file:
+            for line in file:
+                proxy = line.strip()
+                if not proxy or proxy.startswith('#'):
+                    continue
+                if proxy in seen or not is_valid_proxy(proxy):
+                    skipped += 1
+                    continue
+                seen.add(proxy)
+                proxies.append(proxy)
+
+        if skipped:
+            logger.warning(f"{Fore.CYAN}00{Fore.RESET} - {Fore.YELLOW}Skipped {skipped} duplicate or invalid proxies in {path}{Fore.RESET}")
 
         if not proxies:
-            logger.warning(f"{Fore.CYAN}00{Fore.RESET} - {Fore.YELLOW}No proxies found in proxies.txt. Running without proxies{Fore.RESET}")
+            logger.warning(f"{Fore.CYAN}00{Fore.RESET} - {Fore.YELLOW}No proxies found in {path}. Running without proxies{Fore.RESET}")
 
         return proxies
     
     except FileNotFoundError:
-        logger.warning(f"{Fore.CYAN}00{Fore.RESET} - {Fore.YELLOW}File proxies.txt not found. Running without proxies{Fore.RESET}")
+        logger.warning(f"{Fore.CYAN}00{Fore.RESET} - {Fore.YELLOW}File {path} not found. Running without proxies{Fore.RESET}")
         return []
 
     except Exception as e:
         logger.error(f"{Fore.CYAN}00{Fore.RESET} - {Fore.RED}Error loading proxies:{Fore.RESET} {e}")
         return []
 
-# Prompt the user to decide whether to use proxies
+# Decide whether to use proxies from USE_PROXY, prompting only when it is 'ask' and someone is at the terminal
 def get_proxy_choice():
-    while (user_input := input("Do you want to use proxy? (yes/no)? ").strip().lower()) not in ['yes', 'no']:
-        print("Invalid input. Please enter 'yes' or 'no'.")
+    if USE_PROXY in ('true', 'false'):
+        user_input = 'yes' if USE_PROXY == 'true' else 'no'
+
+    # Nobody to ask: use the proxy file when it has proxies
+    elif HEADLESS or not sys.stdin.isatty():
+        return load_proxies()
+
+    else:
+        while (user_input := input("Do you want to use proxy? (yes/no)? ").strip().lower()) not in ['yes', 'no']:
+            print("Invalid input. Please enter 'yes' or 'no'.")
 
-    print(f"You selected: {'Yes' if user_input == 'yes' else 'No'}, ENJOY!\n")
+        print(f"You selected: {'Yes' if user_input == 'yes' else 'No'}, ENJOY!\n")
 
     if user_input == 'yes':
         proxies = load_proxies()
 
         if not proxies:
-            logger.error(f"{Fore.CYAN}00{Fore.RESET} - {Fore.RED}No proxies found in proxies.txt. Please add valid proxies{Fore.RESET}")
+            logger.error(f"{Fore.CYAN}00{Fore.RESET} - {Fore.RED}No proxies found in {PROXIES_FILE}. Please add valid proxies{Fore.RESET}")
             return []
         return proxies
     return []
 
-# Map tokens to proxies, assigning None if proxies are insufficient
+# Lazily map tokens to proxies, assigning None if proxies are insufficient
 def assign_proxies(tokens, proxies):
     if proxies is None:
         proxies = []
 
-    paired = list(zip(tokens[:len(proxies)], proxies))
-    remaining = [(token, None) for token in tokens[len(proxies):]]
-
-    return paired + remaining
+    for position, token in enumerate(tokens):
+        yield token, proxies[position] if position < len(proxies) else None
 
 # Extract the hostname (IP address) from a given proxy URL
 def get_proxy_ip(proxy_url):
@@ -57,6 +98,13 @@ def get_proxy_ip(proxy_url):
     except Exception:
         return "Unknown"
 
+# Proxy label without credentials, as host:port so proxies on one host stay distinguishable
+def proxy_label(proxy):
+    if not proxy:
+        return "direct"
+    parsed = urlparse(proxy)
+    return f"{parsed.hostname}:{parsed.port}"
+
 # Create SSL context to allow self-signed certificates
 def create_ssl_context():
     ssl_context = ssl.create_default_context()
@@ -64,35 +112,87 @@ def create_ssl_context():
     ssl_context.verify_mode = ssl.CERT_NONE
     return ssl_context
 
+# Shared aiohttp session used for every public IP lookup; aiohttp is only imported once a lookup is needed
+def get_ip_session():
+    global ip_session
+    if ip_session is None or ip_session.closed:
+        import aiohttp
+        ip_session = aiohttp.ClientSession(connector=aiohttp.TCPConnector(ssl=create_ssl_context()))
+    return ip_session
+
+# Close the shared IP lookup session, used during shutdown
+async def close_ip_session():
+    global ip_session
+    if ip_session is not None and not ip_session.closed:
+        await ip_session.close()
+    ip_session = None
+
 # Get the public IP address, optionally through a proxy
-async def get_ip_address(proxy=None):
+async def get_ip_address(proxy=None, timeout=None):
     try:
         proxy_ip = get_proxy_ip(proxy) if proxy else "Unknown"
         url = "https://api.ipify.org?format=json"
+        session = get_ip_session()
+        if timeout:
+            from aiohttp import ClientTimeout
+            options = {"timeout": ClientTimeout(total=timeout)}
+        else:
+            options = {}
 
-        ssl_context = create_ssl_context()
-
-        async with aiohttp.ClientSession() as session:
-            async with session.get(url, proxy=proxy, ssl=ssl_context) as response:
+        async with session.get(url, proxy=proxy, **options) as response:
 
-                if response.status == 200:
-                    result = await response.json()
-                    return result.get("ip", "Unknown")
+            if response.status == 200:
+                result = await response.json()
+                return result.get("ip", "Unknown")
 
-                return "Unknown"
+            return "Unknown"
     
     except Exception as e:
         logger.error(f"{Fore.CYAN}00{Fore.RESET} - {Fore.RED}Request failed: Server disconnected{Fore.RESET}")
     
     return proxy_ip
 
+# Whether get_ip_address returned a real exit IP rather than its fallback value
+def is_resolved_ip(ip, proxy=None):
+    return ip != "Unknown" and ip != (get_proxy_ip(proxy) if proxy else "Unknown")
+
+# Store a lookup result, remembering failures for a shorter time
+def cache_ip(proxy, ip):
+    resolved = is_resolved_ip(ip, proxy)
+    if IP_REFRESH == "never" and resolved:
+        expires = float("inf")
+    else:
+        expires = time.monotonic() + (IP_CACHE_TTL if resolved else min(IP_FAILURE_TTL, IP_CACHE_TTL))
+
+    ip_cache[proxy] = (ip, expires)
+
+# Look up the public IP once and cache it
+async def lookup_ip(proxy):
+    ip = await get_ip_address(proxy)
+    cache_ip(proxy, ip)
+    return ip
+
+# Return the cached public IP for a proxy, sharing one in-flight lookup between callers
+async def get_cached_ip(proxy=None):
+    cached = ip_cache.get(proxy)
+    if cached and cached[1] > time.monotonic():
+        return cached[0]
+
+    task = ip_lookups.get(proxy)
+    if task is None:
+        task = ip_lookups[proxy] = asyncio.ensure_future(lookup_ip(proxy))
+        task.add_done_callback(lambda _: ip_lookups.pop(proxy, None))
+
+    # Shield so one cancelled caller does not abort the lookup for the others
+    return await asyncio.shield(task)
+
 # Resolves IP or proxy for the account
 async def resolve_ip(account):
     try:
         if account.proxy and account.proxy.startswith("http"):
-            return await get_ip_address(account.proxy)
+            return await get_cached_ip(account.proxy)
         else:
-            return await get_ip_address()
+            return await get_cached_ip()
     except Exception as e:
         logger.error(f"{Fore.CYAN}{account.index:02d}{Fore.RESET} - {Fore.RED}Failed to resolve proxy or IP address:{Fore.RESET} {e}")
         return "Unknown"
@@ -0,0 +1,85 @@
+import asyncio
+import time
+
+from email.utils import parsedate_to_datetime
+from urllib.parse import urlparse
+
+from utils.services.proxy_manager import get_proxy_ip
+from utils.settings import logger, Fore
+
+
+# Cooldown deadlines (monotonic seconds) keyed by (host, proxy)
+cooldowns = {}
+throttle_counts = {}
+
+
+# Build the cooldown key for a request
+def limiter_key(url, proxy):
+    return urlparse(url).hostname, proxy
+
+# Parse a Retry-After header given either as seconds or as an HTTP date
+def parse_retry_after(value, default=5):
+    if value is None:
+        return default
+    try:
+        return max(float(value), 0)
+    except (TypeError, ValueError):
+        pass
+    try:
+        return max(parsedate_to_datetime(value).timestamp() - time.time(), 0)
+    except (TypeError, ValueError):
+        return default
+
+# Put a host/proxy pair on cooldown without blocking any coroutine
+def throttle(url, proxy, delay, reason):
+    key = limiter_key(url, proxy)
+    until = time.monotonic() + delay
+
+    # Never shorten an existing cooldown
+    if cooldowns.get(key, 0) < until:
+        cooldowns[key] = until
+    throttle_counts[key] = throttle_counts.get(key, 0) + 1
+
+    logger.warning(f"{Fore.CYAN}00{Fore.RESET} - {Fore.YELLOW}Throttling {key[0]} via {get_proxy_ip(proxy) if proxy else 'direct connection'} "
+                   f"for {delay:.1f} seconds ({reason}){Fore.RESET}")
+
+# Seconds left before requests for this host/proxy pair may be sent again
+def cooldown_remaining(url, proxy):
+    key = limiter_key(url, proxy)
+    until = cooldowns.get(key)
+    if until is None:
+        return 0
+
+    remaining = until - time.monotonic()
+    if remaining <= 0:
+        del cooldowns[key]
+        return 0
+    return remaining
+
+# Wait out the cooldown for the account's host/proxy pair, only suspending this coroutine
+async def wait_for_cooldown(url, account):
+    remaining = cooldown_remaining(url, account.proxy)
+    if remaining > 0:
+        logger.info(f"{Fore.CYAN}{account.index:02d}{Fore.RESET} - {Fore.YELLOW}Rate limited, waiting {remaining:.2f} seconds before {urlparse(url).path}{Fore.RESET}")
+        await asyncio.sleep(remaining)
+
+# Currently throttled host/proxy pairs with their remaining cooldown and throttle count
+def rate_limit_snapshot():
+    now = time.monotonic()
+    return {
+        key: {"remaining": until - now, "count": throttle_counts.get(key, 0)}
+        for key, until in list(cooldowns.items())
+        if until > now
+    }
+
+# Log a one-line summary of throttled proxies
+def log_rate_limit_state():
+    snapshot = rate_limit_snapshot()
+    if not snapshot:
+        return
+
+    summary = ", ".join(
+        f"{host} via {get_proxy_ip(proxy) if proxy else 'direct'} ({state['remaining']:.0f}s, x{state['count']})"
+        for (host, proxy), state in sorted(snapshot.items(), key=lambda item: -item[1]["remaining"])
+    )
+    logger.info(f"{Fore.CYAN}00{Fore.RESET} - {Fore.YELLOW}Throttled: {summary}{Fore.RESET}")
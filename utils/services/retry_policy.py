@@ -0,0 +1,124 @@
+import time
+
+from collections import deque
+from urllib.parse import urlparse
+
+from utils.settings import RETRY_BUDGET_RATIO, RETRY_BUDGET_BURST, BREAKER_FAILURE_RATIO, BREAKER_MIN_REQUESTS
+from utils.settings import BREAKER_COOLDOWN, BREAKER_MAX_COOLDOWN, logger, Fore
+
+
+# HTTP statuses that will fail the same way on every retry (bad request, invalid token, missing endpoint)
+FATAL_STATUSES = {400, 401, 404, 405, 410, 422}
+# Outcomes kept per host to compute the breaker's failure ratio
+BREAKER_WINDOW = 50
+
+
+# Raised for errors that retrying cannot fix
+class FatalRequestError(Exception):
+    def __init__(self, message, status_code=None):
+        super().__init__(message)
+        self.status_code = status_code
+
+
+# Whether a failed HTTP status is worth retrying
+def is_retryable_status(status_code):
+    return status_code not in FATAL_STATUSES
+
+# Whether an outcome says the API host itself is failing (server errors and connection failures)
+def is_host_failure(status_code):
+    return status_code is None or status_code >= 500
+
+
+# Caps retries to a fraction of first attempts so retries cannot multiply load during an outage
+class RetryBudget:
+    def __init__(self, ratio=RETRY_BUDGET_RATIO, burst=RETRY_BUDGET_BURST):
+        self.ratio = ratio
+        self.capacity = max(burst, 1)
+        self.tokens = float(self.capacity)
+        self.exhausted = 0
+
+    # Every first attempt earns a fraction of a retry
+    def record_attempt(self):
+        self.tokens = min(self.tokens + self.ratio, self.capacity)
+
+    def try_spend(self):
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return True
+        self.exhausted += 1
+        return False
+
+
+# Per-host breaker: opens when most recent requests fail, then lets a single probe through after a cooldown
+class CircuitBreaker:
+    def __init__(self, host):
+        self.host = host
+        self.outcomes = deque(maxlen=BREAKER_WINDOW)
+        self.state = "closed"
+        self.opened_until = 0.0
+        self.cooldown = BREAKER_COOLDOWN
+        self.probe_started = None
+
+    def remaining(self):
+        if self.state != "open":
+            return 0
+        return max(self.opened_until - time.monotonic(), 0)
+
+    # Whether a request may be sent now; moves an expired open breaker to half-open
+    def allow(self):
+        if self.state == "closed":
+            return True
+        if self.state == "open":
+            if time.monotonic() < self.opened_until:
+                return False
+            self.state = "half-open"
+            self.probe_started = None
+            logger.info(f"{Fore.CYAN}00{Fore.RESET} - {Fore.YELLOW}Circuit for {self.host} half-open, probing{Fore.RESET}")
+
+        # Half-open: one probe at a time; a probe that never reported back (proxy error, 429) is replaced after a cooldown
+        now = time.monotonic()
+        if self.probe_started is not None and now - self.probe_started < BREAKER_COOLDOWN:
+            return False
+        self.probe_started = now
+        return True
+
+    def record(self, failed):
+        if self.state == "half-open":
+            self.probe_started = None
+            if failed:
+                self.trip(min(self.cooldown * 2, BREAKER_MAX_COOLDOWN))
+            else:
+                self.state = "closed"
+                self.cooldown = BREAKER_COOLDOWN
+                self.outcomes.clear()
+                logger.info(f"{Fore.CYAN}00{Fore.RESET} - {Fore.GREEN}Circuit for {self.host} closed{Fore.RESET}")
+            return
+
+        self.outcomes.append(failed)
+        if self.state == "closed" and len(self.outcomes) >= BREAKER_MIN_REQUESTS:
+            if sum(self.outcomes) / len(self.outcomes) >= BREAKER_FAILURE_RATIO:
+                self.trip(self.cooldown)
+
+    def trip(self, cooldown):
+        self.state = "open"
+        self.cooldown = cooldown
+        self.opened_until = time.monotonic() + cooldown
+        self.outcomes.clear()
+        logger.warning(f"{Fore.CYAN}00{Fore.RESET} - {Fore.RED}Circuit for {self.host} open for {cooldown} seconds: API is failing{Fore.RESET}")
+
+
+retry_budget = RetryBudget()
+breakers = {}
+
+
+def get_breaker(url):
+    host = urlparse(url).hostname
+    breaker = breakers.get(host)
+    if breaker is None:
+        breaker = breakers[host] = CircuitBreaker(host)
+    return breaker
+
+# Seconds until requests to this URL's host are allowed again (0 when its breaker is not open)
+def breaker_remaining(url):
+    breaker = breakers.get(urlparse(url).hostname)
+    return breaker.remaining() if breaker else 0
@@ -0,0 +1,94 @@
+import asyncio
+import time
+
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+from curl_cffi.requests import AsyncSession
+from http.cookiejar import CookieJar
+
+from utils.settings import SESSION_POOL_SIZE, SESSION_IDLE_TIMEOUT, SESSION_MAX_CLIENTS, logger, Fore
+
+
+# Pooled sessions keyed by proxy URL (None for direct connections)
+sessions = OrderedDict()
+last_sweep = 0.0
+
+
+# Cookie jar that never stores a cookie, so a cookie set in one account's response is never sent with another
+# account's request through the same pooled session
+class DiscardingCookieJar(CookieJar):
+    def set_cookie(self, cookie):
+        pass
+
+
+# Pool entry holding a session and its usage bookkeeping
+class PooledSession:
+    def __init__(self, proxy):
+        self.proxy = proxy
+        self.session = AsyncSession(
+            impersonate="safari15_5",
+            proxies={"http": proxy, "https": proxy} if proxy else None,
+            cookies=DiscardingCookieJar(),
+            max_clients=SESSION_MAX_CLIENTS,
+        )
+        self.in_use = 0
+        self.last_used = time.monotonic()
+
+
+# Close a session in the background without blocking the caller
+def schedule_close(entry):
+    task = asyncio.get_running_loop().create_task(entry.session.close())
+    task.add_done_callback(lambda t: t.cancelled() or t.exception())
+
+# Drop sessions that have been idle longer than SESSION_IDLE_TIMEOUT
+def evict_idle(now):
+    global last_sweep
+    if now - last_sweep < SESSION_IDLE_TIMEOUT / 2:
+        return
+
+    last_sweep = now
+    for proxy, entry in list(sessions.items()):
+        if entry.in_use == 0 and now - entry.last_used > SESSION_IDLE_TIMEOUT:
+            del sessions[proxy]
+            schedule_close(entry)
+            logger.debug(f"{Fore.CYAN}00{Fore.RESET} - Evicted idle session for {proxy or 'direct connection'}")
+
+# Evict least recently used idle sessions while the pool is over its size limit
+def enforce_pool_size():
+    for proxy in list(sessions):
+        if len(sessions) <= SESSION_POOL_SIZE:
+            break
+        entry = sessions[proxy]
+        if entry.in_use == 0:
+            del sessions[proxy]
+            schedule_close(entry)
+
+# Borrow the pooled session for a proxy, creating it on first use
+@asynccontextmanager
+async def acquire_session(proxy=None):
+    now = time.monotonic()
+    evict_idle(now)
+
+    entry = sessions.get(proxy)
+    if entry is None:
+        entry = sessions[proxy] = PooledSession(proxy)
+        enforce_pool_size()
+    else:
+        sessions.move_to_end(proxy)
+
+    entry.in_use += 1
+    try:
+        yield entry.session
+    finally:
+        entry.in_use -= 1
+        entry.last_used = time.monotonic()
+
+# Close every pooled session, used during shutdown
+async def close_sessions():
+    entries = list(sessions.values())
+    sessions.clear()
+
+    results = await asyncio.gather(*(entry.session.close() for entry in entries), return_exceptions=True)
+    for entry, result in zip(entries, results):
+        if isinstance(result, Exception):
+            logger.debug(f"{Fore.CYAN}00{Fore.RESET} - Failed to close session for {entry.proxy or 'direct connection'}: {result}")
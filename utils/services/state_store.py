@@ -0,0 +1,160 @@
+import asyncio
+import json
+import sqlite3
+import threading
+import time
+
+from utils.settings import STATE_FILE, STATE_TTL, CONNECTION_STATES, logger, Fore
+
+
+# Rows are looked up in chunks to stay under SQLite's bound parameter limit
+QUERY_CHUNK = 500
+
+# One row per copy of a token, since a token may run on several connections with their own ping counters
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS account_state (
+    token TEXT NOT NULL,
+    copy INTEGER NOT NULL DEFAULT 0,
+    activated INTEGER NOT NULL DEFAULT 0,
+    uid TEXT,
+    claimed_rewards TEXT NOT NULL DEFAULT '[]',
+    ping_count INTEGER NOT NULL DEFAULT 0,
+    successful_pings INTEGER NOT NULL DEFAULT 0,
+    score INTEGER NOT NULL DEFAULT 0,
+    last_ping_time REAL,
+    synced_at REAL,
+    updated_at REAL NOT NULL,
+    PRIMARY KEY (token, copy)
+)
+"""
+
+# State files from before copies were numbered keep one row per token, which becomes the token's first copy
+MIGRATE = """
+INSERT OR IGNORE INTO account_state
+    (token, copy, activated, uid, claimed_rewards, ping_count, successful_pings, score, last_ping_time, synced_at, updated_at)
+SELECT token, 0, activated, uid, claimed_rewards, ping_count, successful_pings, score, last_ping_time, synced_at, updated_at
+FROM accounts
+"""
+
+UPSERT = """
+INSERT INTO account_state (token, copy, activated, uid, claimed_rewards, ping_count, successful_pings, score, last_ping_time, synced_at, updated_at)
+VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+ON CONFLICT(token, copy) DO UPDATE SET
+    activated = MAX(activated, excluded.activated),
+    uid = COALESCE(excluded.uid, uid),
+    claimed_rewards = excluded.claimed_rewards,
+    ping_count = excluded.ping_count,
+    successful_pings = excluded.successful_pings,
+    score = excluded.score,
+    last_ping_time = COALESCE(excluded.last_ping_time, last_ping_time),
+    synced_at = COALESCE(excluded.synced_at, synced_at),
+    updated_at = excluded.updated_at
+"""
+
+
+# SQLite-backed store of per-account state that survives restarts
+class StateStore:
+    def __init__(self, path):
+        self.path = path
+        self.lock = threading.Lock()
+        self.connection = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute("PRAGMA synchronous=NORMAL")
+        self.connection.execute(SCHEMA)
+        if self.connection.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'accounts'").fetchone():
+            self.connection.execute(MIGRATE)
+            self.connection.execute("DROP TABLE accounts")
+        self.connection.commit()
+
+    # Fetch stored rows for the given tokens, as {token: {copy: row}}
+    def load(self, tokens):
+        tokens = list(set(tokens))
+        rows = {}
+        with self.lock:
+            for start in range(0, len(tokens), QUERY_CHUNK):
+                chunk = tokens[start:start + QUERY_CHUNK]
+                cursor = self.connection.execute(
+                    "SELECT token, copy, activated, uid, claimed_rewards, ping_count, successful_pings, score, last_ping_time, synced_at "
+                    f"FROM account_state WHERE token IN ({','.join('?' * len(chunk))})",
+                    chunk,
+                )
+                for row in cursor:
+                    rows.setdefault(row[0], {})[row[1]] = row
+        return rows
+
+    def write(self, rows):
+        with self.lock:
+            self.connection.executemany(UPSERT, rows)
+            self.connection.commit()
+
+    # Persist account snapshots without blocking the event loop
+    async def save(self, accounts):
+        rows = [snapshot_account(account) for account in accounts]
+        if rows:
+            await asyncio.to_thread(self.write, rows)
+
+    def close(self):
+        with self.lock:
+            self.connection.close()
+
+
+# Serialize the persistent part of an account
+def snapshot_account(account):
+    browser = account.browser
+    return (
+        account.token,
+        account.copy,
+        int(account.status_connect == CONNECTION_STATES["CONNECTED"]),
+        account.uid,
+        json.dumps(sorted(account.claimed_rewards or ()), ensure_ascii=False),
+        browser.ping_count,
+        browser.successful_pings,
+        browser.score,
+        browser.last_ping_time,
+        account.synced_at,
+        time.time(),
+    )
+
+# Restore stored state onto freshly created accounts, returning how many were found; a copy without its own row
+# still takes the token's activation, profile and claims from another copy, but starts its ping counters afresh
+def restore_accounts(store, accounts):
+    rows = store.load(account.token for account in accounts)
+    for account in accounts:
+        copies = rows.get(account.token)
+        if not copies:
+            continue
+
+        row = copies.get(account.copy)
+        shared = row or max(copies.values(), key=lambda other: other[9] or 0)
+        _, _, activated, uid, claimed_rewards, _, _, _, _, synced_at = shared
+        if activated:
+            account.status_connect = CONNECTION_STATES["CONNECTED"]
+        account.uid = uid
+        account.synced_at = synced_at
+        for reward_name in json.loads(claimed_rewards):
+            account.mark_claimed(reward_name)
+
+        if row is None:
+            continue
+        _, _, _, _, _, ping_count, successful_pings, score, last_ping_time, _ = row
+        browser = account.browser
+        browser.ping_count = ping_count
+        browser.successful_pings = successful_pings
+        browser.score = score
+        browser.last_ping_time = last_ping_time
+
+    return sum(account.token in rows for account in accounts)
+
+# Whether an account's profile was synced recently enough to skip the startup fetch
+def is_fresh(account):
+    return bool(account.uid and account.synced_at and time.time() - account.synced_at < STATE_TTL)
+
+# Open the configured state store, or return None when persistence is disabled
+def open_state_store(path=STATE_FILE):
+    if not path:
+        return None
+    try:
+        return StateStore(path)
+    except sqlite3.Error as e:
+        logger.error(f"{Fore.CYAN}00{Fore.RESET} - {Fore.RED}Failed to open state file {path}: {e}. Running without saved state{Fore.RESET}")
+        return None
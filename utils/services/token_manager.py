@@ -1,26 +1,64 @@
 import asyncio
 
-from utils.settings import logger, Fore
+from utils.settings import MAX_CONNECTIONS_PER_TOKEN, TOKENS_FILE, logger, Fore
 
 
 # Track processed tokens globally
 processed_tokens = set()
 lock = asyncio.Lock()
 
+# Counters filled in while tokens.txt is streamed
+load_stats = {"tokens": 0, "duplicate_tokens": 0, "invalid_tokens": 0}
+
 # Masks sensitive parts of a token
 def mask_token(token):
     return f"{token[:5]}--{token[-5:]}"
 
-# Load tokens from a file
-async def load_tokens():
+# Yield valid tokens from tokens.txt one line at a time
+def read_tokens(file):
+    seen = {}
+    for line in file:
+        token = line.strip()
+        if not token or token.startswith('#'):
+            continue
+
+        if any(char.isspace() for char in token):
+            load_stats["invalid_tokens"] += 1
+            continue
+
+        # A token may be repeated to run it on several proxies, up to the connection limit
+        count = seen.get(token, 0)
+        if count >= MAX_CONNECTIONS_PER_TOKEN:
+            load_stats["duplicate_tokens"] += 1
+            continue
+
+        seen[token] = count + 1
+        load_stats["tokens"] += 1
+        yield token
+
+# Stream tokens from a file, opening it eagerly so a missing file fails at startup; the load totals are logged once it is read
+def iter_tokens(path=TOKENS_FILE):
     try:
-        with open('tokens.txt', 'r') as file:
-            tokens = file.read().splitlines()
-        return tokens
+        file = open(path, 'r')
     except Exception as e:
         logger.error(f"{Fore.CYAN}00{Fore.RESET} - {Fore.RED}Error loading tokens: {e}{Fore.RESET}")
         raise SystemExit("Exiting due to failure in loading tokens")
 
+    def generate():
+        with file:
+            yield from read_tokens(file)
+        log_token_stats()
+
+    return generate()
+
+# Log how many tokens were loaded and skipped
+def log_token_stats():
+    logger.info(
+        f"{Fore.CYAN}00{Fore.RESET} - Loaded {load_stats['tokens']} tokens"
+        f" (skipped {load_stats['duplicate_tokens']} over the {MAX_CONNECTIONS_PER_TOKEN}-connection limit,"
+        f" {load_stats['invalid_tokens']} invalid)"
+    )
+
 # Function to add a token to the processed list
 async def mark_token(account):
     async with lock:
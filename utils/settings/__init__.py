@@ -1,4 +1,23 @@
-from .logger_setup import logger, Fore, init, setup_logging, startup_art
+from .logger_setup import logger, Fore, Style, init, setup_logging, startup_art
 from .config import DOMAIN_API, CONNECTION_STATES
 from .config import ACTIVATE_ACCOUNTS, DAILY_CLAIM
-from .config import PING_INTERVAL, PING_DURATION, REQUEST_TIMEOUT, DEBUG
\ No newline at end of file
+from .config import TOKENS_FILE, PROXIES_FILE, USE_PROXY, HEADLESS
+from .config import PING_INTERVAL, PING_DURATION, REQUEST_TIMEOUT, DEBUG
+from .config import SESSION_POOL_SIZE, SESSION_IDLE_TIMEOUT, SESSION_MAX_CLIENTS
+from .config import IP_CACHE_TTL, IP_REFRESH
+from .config import PING_CONCURRENCY, PROXY_CONCURRENCY
+from .config import WORKERS
+from .config import MAX_CONNECTIONS_PER_TOKEN, LOAD_BATCH_SIZE
+from .config import STARTUP_CONCURRENCY
+from .config import STATE_FILE, STATE_TTL, STATE_FLUSH_INTERVAL
+from .config import CLAIM_RECHECK_INTERVAL, CLAIM_CONCURRENCY
+from .config import PROXY_FAILURE_THRESHOLD, PROXY_QUARANTINE, PROXY_MAX_QUARANTINE, PROXY_MAX_ACCOUNTS
+from .config import PROXY_CHECK, PROXY_CHECK_DROP, PROXY_CHECK_CONCURRENCY, PROXY_CHECK_TIMEOUT, PROXY_CHECK_CACHE, PROXY_CHECK_TTL
+from .config import PING_ENDPOINTS, PING_HEDGE_PERCENTILE
+from .config import RETRY_BUDGET_RATIO, RETRY_BUDGET_BURST, BREAKER_FAILURE_RATIO, BREAKER_MIN_REQUESTS, BREAKER_COOLDOWN, BREAKER_MAX_COOLDOWN
+from .config import METRICS_PORT, METRICS_HOST
+from .config import LOG_FORMAT, LOG_FILE, LOG_ROTATION, LOG_RETENTION
+from .config import DASHBOARD, DASHBOARD_REFRESH
+from .config import FAST_MODE
+from .config import LOOP_LAG_WARN, SLOW_CALLBACK, PROFILE_SECONDS, PROFILE_DIR
+from .config import RELOAD_INTERVAL, reload_settings
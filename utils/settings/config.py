@@ -1,37 +1,138 @@
 import os
-from dotenv import load_dotenv
+from dotenv import dotenv_values, load_dotenv
 
 
+# Variables set in the real environment take precedence over .env, at startup and on every reload
+environment_keys = set(os.environ)
+
 # Explicitly load the .env file
 dotenv_path = ".env"
 load_dotenv(dotenv_path=dotenv_path)
 
+# Input files and the proxy choice: 'ask' prompts at startup unless HEADLESS is set or stdin is not a terminal,
+# in which case proxies are used whenever PROXIES_FILE has any
+TOKENS_FILE = os.getenv('TOKENS_FILE', 'tokens.txt')
+PROXIES_FILE = os.getenv('PROXIES_FILE', 'proxies.txt')
+USE_PROXY = os.getenv('USE_PROXY', 'ask').strip().lower()
+HEADLESS = os.getenv('HEADLESS', 'False').strip().lower() == 'true'
+
 # Feature toggles
 ACTIVATE_ACCOUNTS = os.getenv('ACTIVATE_ACCOUNTS', 'True') == 'True'
 DAILY_CLAIM = os.getenv('DAILY_CLAIM', 'True') == 'True'
 
-# App constants
+# App constants (PING_INTERVAL and REQUEST_TIMEOUT are reloadable, read them as config.NAME)
 PING_INTERVAL = int(os.getenv('PING_INTERVAL', 60))
 PING_DURATION = int(os.getenv('PING_DURATION', 1800))
 REQUEST_TIMEOUT = int(os.getenv("REQUEST_TIMEOUT", 30))
 
+# Seconds between checks of tokens.txt, proxies.txt and .env for changes (0 disables watching; SIGHUP still reloads)
+RELOAD_INTERVAL = int(os.getenv('RELOAD_INTERVAL', 5))
+
+# Copies of the same token allowed in tokens.txt (one connection each)
+MAX_CONNECTIONS_PER_TOKEN = int(os.getenv('MAX_CONNECTIONS_PER_TOKEN', 3))
+
+# Accounts created per batch while tokens.txt is streamed
+LOAD_BATCH_SIZE = int(os.getenv('LOAD_BATCH_SIZE', 500))
+
+# Accounts going through activation and profile sync at once during startup
+STARTUP_CONCURRENCY = int(os.getenv('STARTUP_CONCURRENCY', 50))
+
+# Reward claim scheduling: longest wait between mission checks and concurrent claim sweeps
+CLAIM_RECHECK_INTERVAL = int(os.getenv('CLAIM_RECHECK_INTERVAL', 3600))
+CLAIM_CONCURRENCY = int(os.getenv('CLAIM_CONCURRENCY', 20))
+
+# Saved account state (empty STATE_FILE disables it); profiles older than STATE_TTL seconds are refreshed
+STATE_FILE = os.getenv('STATE_FILE', 'state.db')
+STATE_TTL = int(os.getenv('STATE_TTL', 21600))
+STATE_FLUSH_INTERVAL = int(os.getenv('STATE_FLUSH_INTERVAL', 60))
+
+# Number of worker processes the accounts are sharded across (1 runs in-process)
+WORKERS = int(os.getenv('WORKERS', 1))
+
+# Ping scheduler concurrency caps (global and per proxy)
+PING_CONCURRENCY = int(os.getenv('PING_CONCURRENCY', 100))
+PROXY_CONCURRENCY = int(os.getenv('PROXY_CONCURRENCY', 2))
+
+# Startup proxy check (PROXY_CHECK_DROP=True drops failed proxies instead of keeping them at the end of the list)
+PROXY_CHECK = os.getenv('PROXY_CHECK', 'True') == 'True'
+PROXY_CHECK_DROP = os.getenv('PROXY_CHECK_DROP', 'False') == 'True'
+PROXY_CHECK_CONCURRENCY = int(os.getenv('PROXY_CHECK_CONCURRENCY', 50))
+PROXY_CHECK_TIMEOUT = int(os.getenv('PROXY_CHECK_TIMEOUT', 10))
+PROXY_CHECK_CACHE = os.getenv('PROXY_CHECK_CACHE', 'proxy_check.json')
+PROXY_CHECK_TTL = int(os.getenv('PROXY_CHECK_TTL', 3600))
+
+# Proxy health: failures before quarantine, quarantine cooldown bounds and accounts per spare proxy
+PROXY_FAILURE_THRESHOLD = int(os.getenv('PROXY_FAILURE_THRESHOLD', 3))
+PROXY_QUARANTINE = int(os.getenv('PROXY_QUARANTINE', 60))
+PROXY_MAX_QUARANTINE = int(os.getenv('PROXY_MAX_QUARANTINE', 3600))
+PROXY_MAX_ACCOUNTS = int(os.getenv('PROXY_MAX_ACCOUNTS', 1))
+
+# HTTP session pool
+SESSION_POOL_SIZE = int(os.getenv('SESSION_POOL_SIZE', 256))
+SESSION_IDLE_TIMEOUT = int(os.getenv('SESSION_IDLE_TIMEOUT', 300))
+SESSION_MAX_CLIENTS = int(os.getenv('SESSION_MAX_CLIENTS', 100))
+
+# Public IP lookup cache ('lazy' refreshes after IP_CACHE_TTL, 'never' keeps the first result)
+IP_CACHE_TTL = int(os.getenv('IP_CACHE_TTL', 600))
+IP_REFRESH = os.getenv('IP_REFRESH', 'lazy').strip().lower()
+
+# Ping endpoints (comma-separated) and the latency percentile after which a ping is hedged
+PING_ENDPOINTS = [url.strip() for url in os.getenv('PING_ENDPOINTS', '').split(',') if url.strip()]
+PING_HEDGE_PERCENTILE = float(os.getenv('PING_HEDGE_PERCENTILE', 95))
+
+# Local Prometheus metrics endpoint (0 disables it)
+METRICS_PORT = int(os.getenv('METRICS_PORT', 0))
+METRICS_HOST = os.getenv('METRICS_HOST', '127.0.0.1')
+
+# Retry budget and circuit breaker
+RETRY_BUDGET_RATIO = float(os.getenv('RETRY_BUDGET_RATIO', 0.2))
+RETRY_BUDGET_BURST = int(os.getenv('RETRY_BUDGET_BURST', 100))
+BREAKER_FAILURE_RATIO = float(os.getenv('BREAKER_FAILURE_RATIO', 0.5))
+BREAKER_MIN_REQUESTS = int(os.getenv('BREAKER_MIN_REQUESTS', 20))
+BREAKER_COOLDOWN = int(os.getenv('BREAKER_COOLDOWN', 30))
+BREAKER_MAX_COOLDOWN = int(os.getenv('BREAKER_MAX_COOLDOWN', 600))
+
+# Logging: 'pretty' (coloured console), 'plain' or 'json'; LOG_FILE enables a rotating log file
+LOG_FORMAT = os.getenv('LOG_FORMAT', 'pretty').strip().lower()
+LOG_FILE = os.getenv('LOG_FILE', '')
+LOG_ROTATION = os.getenv('LOG_ROTATION', '50 MB')
+LOG_RETENTION = int(os.getenv('LOG_RETENTION', 5))
+
+# Live terminal dashboard in place of the console log (single-process mode only)
+DASHBOARD = os.getenv('DASHBOARD', 'False').strip().lower() == 'true'
+DASHBOARD_REFRESH = float(os.getenv('DASHBOARD_REFRESH', 2))
+
+# Use uvloop and orjson when they are installed (pip install uvloop orjson)
+FAST_MODE = os.getenv('FAST_MODE', 'False').strip().lower() == 'true'
+
 # Debugging
 DEBUG = os.getenv('DEBUG', 'False').strip().lower() == 'true'
 
+# Instrumentation: warn when the event loop is blocked longer than LOOP_LAG_WARN seconds, name callbacks slower than
+# SLOW_CALLBACK seconds (0 disables; turns on asyncio debug mode), and profile the first PROFILE_SECONDS into PROFILE_DIR
+LOOP_LAG_WARN = float(os.getenv('LOOP_LAG_WARN', 0.5))
+SLOW_CALLBACK = float(os.getenv('SLOW_CALLBACK', 0))
+PROFILE_SECONDS = int(os.getenv('PROFILE_SECONDS', 0))
+PROFILE_DIR = os.getenv('PROFILE_DIR', 'profiles')
+
+# API hosts, overridable to point the bot at a local stand-in server (see benchmarks/mock_api.py)
+API_BASE_URL = os.getenv('API_BASE_URL', 'https://api.nodepay.ai').rstrip('/')
+PING_BASE_URL = os.getenv('PING_BASE_URL', 'https://nw.nodepay.org').rstrip('/')
+
 # Nodepay API endpoints
 DOMAIN_API = {
 
     # Auth Endpoints
-    "ACTIVATE": "https://api.nodepay.ai/api/auth/active-account",
+    "ACTIVATE": f"{API_BASE_URL}/api/auth/active-account",
 
-    # Network Endpoints
-    "PING": ["https://nw.nodepay.org/api/network/ping"],
-    "SESSION": "https://api.nodepay.ai/api/auth/session",
+    # Network Endpoints (PING_ENDPOINTS in .env overrides the ping list)
+    "PING": PING_ENDPOINTS or [f"{PING_BASE_URL}/api/network/ping"],
+    "SESSION": f"{API_BASE_URL}/api/auth/session",
 
     # Earn and Mission Endpoints
-    "EARN_INFO": "https://api.nodepay.ai/api/earn/info",
-    "MISSION": "https://api.nodepay.ai/api/mission?platform=MOBILE",
-    "COMPLETE_MISSION": "https://api.nodepay.ai/api/mission/complete-mission"
+    "EARN_INFO": f"{API_BASE_URL}/api/earn/info",
+    "MISSION": f"{API_BASE_URL}/api/mission?platform=MOBILE",
+    "COMPLETE_MISSION": f"{API_BASE_URL}/api/mission/complete-mission"
 }
 
 # Connection states to track account status
@@ -41,3 +142,23 @@ CONNECTION_STATES = {
     "CONNECTED": 1,
     "FAILED": 0
 }
+
+
+# Settings that may change while running, with the type they are parsed as
+RELOADABLE_SETTINGS = {"PING_INTERVAL": int, "REQUEST_TIMEOUT": int}
+
+# Re-read .env and update the reloadable settings in place, returning the ones that changed; settings given in
+# the environment at startup keep their value, as they did when .env was first loaded
+def reload_settings():
+    values = dotenv_values(dotenv_path)
+    changed = {}
+    for name, cast in RELOADABLE_SETTINGS.items():
+        if name in environment_keys or values.get(name) is None:
+            continue
+        try:
+            value = cast(values[name])
+        except ValueError:
+            continue
+        if value != globals()[name]:
+            globals()[name] = changed[name] = value
+    return changed
@@ -5,12 +5,28 @@ from loguru import logger
 from textwrap import fill
 from colorama import Fore, Style, init
 
-from utils.settings.config import DEBUG
+from utils.settings.config import DEBUG, DASHBOARD, LOG_FORMAT, LOG_FILE, LOG_ROTATION, LOG_RETENTION
 
 
 # Initialize colorama
 init(autoreset=True)
 
+# Bytes buffered before the log file is written, so lines reach the disk in batches
+FILE_BUFFER_SIZE = 64 * 1024
+# Width console messages are wrapped to, and the ANSI colour codes stripped before wrapping
+WRAP_WIDTH = 120
+ANSI_ESCAPE = re.compile(r'\033\[.*?m')
+
+
+# Colour codes that render as empty strings, so plain and JSON logs never contain ANSI escapes to strip
+class NoColor:
+    def __getattr__(self, name):
+        return ""
+
+
+if LOG_FORMAT != "pretty":
+    Fore = Style = NoColor()
+
 # ASCII art for program startup
 start_text = """
     _   __          __  Version 2.0 by Enukio
@@ -23,51 +39,70 @@ start_text = """
 Welcome to NodepayBot - Automate your tasks effortlessly!
 Max 3 connections per account. Too many proxies may cause issues.
 
-------------------------------------------------------------
-Total Tokens: {total_tokens}     |     Total Proxies: {total_proxies}
 ------------------------------------------------------------
 """
 
-# Reads file and counts lines
-def count_lines(file_path):
-    try:
-        with open(file_path, 'r') as file:
-            return sum(1 for line in file if line.strip())
-    except FileNotFoundError:
-        return 0
-
-# Wraps messages to fit within the allowed width
+# Wraps messages to fit within the allowed width; runs in the logging caller, so single-line messages that
+# already fit only have their colours stripped and skip textwrap, which would leave them unchanged
 def wrap_message(record):
-    if record["message"].startswith(Fore.CYAN) and "-" in record["message"]:
+    message = record["message"]
+    if message.startswith(Fore.CYAN) and "-" in message:
         return True
-    
-    message_without_color = re.sub(r'\033\[.*?m', '', record["message"])
-    wrapped_message = fill(message_without_color, width=120)
-    record["message"] = wrapped_message
-    
+
+    message = ANSI_ESCAPE.sub('', message)
+    if len(message) <= WRAP_WIDTH and message.isprintable() and message == message.strip():
+        record["message"] = message
+    else:
+        record["message"] = fill(message, width=WRAP_WIDTH)
     return True
 
+# Log file path for a worker process, so workers never rotate the same file
+def worker_log_file(worker_id):
+    if worker_id is None:
+        return LOG_FILE
+    stem, dot, extension = LOG_FILE.rpartition(".")
+    return f"{stem}.worker{worker_id}.{extension}" if dot else f"{LOG_FILE}.worker{worker_id}"
+
 # Setup logging configuration
-def setup_logging():
+def setup_logging(worker_id=None):
     logger.remove()
     log_level = "DEBUG" if DEBUG else "INFO"
-    logger.add(
-        sink=sys.stdout,
-        format="<magenta>[Nodepay]</magenta> | {time:YYYY-MM-DD HH:mm:ss} | {message}",
-        colorize=True,
-        enqueue=True,
-        filter=wrap_message,
-        level=log_level
-    )
+
+    # The dashboard owns the terminal in single-process mode; logs then only go to LOG_FILE
+    if DASHBOARD and worker_id is None:
+        pass
+    elif LOG_FORMAT == "pretty":
+        logger.add(
+            sink=sys.stdout,
+            format="<magenta>[Nodepay]</magenta> | {time:YYYY-MM-DD HH:mm:ss} | {message}",
+            colorize=True,
+            enqueue=True,
+            filter=wrap_message,
+            level=log_level
+        )
+    else:
+        logger.add(
+            sink=sys.stdout,
+            format="{time:YYYY-MM-DD HH:mm:ss} | {level} | {message}",
+            colorize=False,
+            serialize=LOG_FORMAT == "json",
+            enqueue=True,
+            level=log_level
+        )
+
+    if LOG_FILE:
+        logger.add(
+            sink=worker_log_file(worker_id),
+            format="{time:YYYY-MM-DD HH:mm:ss} | {level} | {message}",
+            serialize=LOG_FORMAT == "json",
+            rotation=LOG_ROTATION,
+            retention=LOG_RETENTION,
+            buffering=FILE_BUFFER_SIZE,
+            enqueue=True,
+            level=log_level
+        )
 
 # Function to display the startup art
 def startup_art():
-    total_tokens = count_lines('tokens.txt')
-    total_proxies = count_lines('proxies.txt')
-    
-    formatted_start_text = start_text.format(
-        total_tokens=total_tokens,
-        total_proxies=total_proxies
-    )
-    
-    print(f"\n{Fore.LIGHTCYAN_EX}{formatted_start_text}{Style.RESET_ALL}\n")
+    if LOG_FORMAT == "pretty":
+        print(f"\n{Fore.LIGHTCYAN_EX}{start_text}{Style.RESET_ALL}\n")